@@ -0,0 +1,65 @@
+class AnimationTrack:
+    """
+    Looping animation shared by many sprites. Track only knows which frame
+    index is current - sprites keep their own images and just read the index,
+    so all of them are animated at once and stay synchronised.
+    """
+
+    def __init__(self, frames: tuple) -> None:
+        """Initialize AnimationTrack with (frame index, duration) pairs."""
+        self.frames = frames
+        self.length = sum(duration for _, duration in frames)
+        self.time = 0.0
+        self.frame = frames[0][0]  # current frame index
+
+    def frame_at(self, time: float) -> int:
+        """Return frame index at given time."""
+        time %= self.length
+        for index, duration in self.frames:
+            if time < duration:
+                return index
+            time -= duration
+        return self.frames[-1][0]
+
+    def frame_with_offset(self, offset: float) -> int:
+        """Return current frame index of sprite with its own phase offset."""
+        return self.frame_at(self.time + offset)
+
+    def update(self, time: float) -> None:
+        """Set current frame for given time."""
+        self.time = time
+        self.frame = self.frame_at(time)
+
+
+class Animations:
+    """
+    Registry of named animation tracks. Controller updates all of them once
+    per tick, so cost of animation doesn't depend on number of sprites.
+    """
+
+    def __init__(self) -> None:
+        """Initialize Animations."""
+        self.tracks = {}  # name -> AnimationTrack
+
+    def __getitem__(self, name: str) -> AnimationTrack:
+        return self.tracks[name]
+
+    def add(self, name: str, frames: tuple) -> AnimationTrack:
+        """Create named track (or return existing one)."""
+        track = self.tracks.get(name)
+        if track is None:
+            track = self.tracks[name] = AnimationTrack(frames)
+        return track
+
+    def update(self, time: float) -> None:
+        """Advance all tracks to given time."""
+        for track in self.tracks.values():
+            track.update(time)
+
+
+# the only instance, shared by all sprites
+animations = Animations()
+# coins, question blocks and coin indicator in HUD
+animations.add('blink', ((0, 0.45), (1, 0.15), (2, 0.15), (1, 0.15)))
+# walking enemies
+animations.add('walk', ((0, 0.15), (1, 0.15)))
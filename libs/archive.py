@@ -0,0 +1,143 @@
+# Packed asset archive. All images are put into a single atlas, and atlas,
+# sounds and fonts are stored one after another in a single file:
+#     MAGIC | index size (uint32) | index (JSON) | data
+# Index contains atlas regions of images, offsets of other files in data and
+# modification times and sizes of source files, so stale archive is detected.
+# Run `python -m libs.archive` to (re)build the archive.
+
+from glob import glob
+from io import BytesIO
+from json import dumps, loads
+from mmap import ACCESS_READ, mmap
+from os import stat
+from struct import Struct
+
+from pygame.constants import SRCALPHA
+from pygame.image import load as load_image
+from pygame.image import save as save_image
+from pygame.rect import Rect
+from pygame.surface import Surface
+
+from .constants import ASSETS_ARCHIVE
+
+MAGIC = b'SMBPAK1\0'
+HEADER = Struct('<8sI')
+ATLAS = 'atlas.png'
+ATLAS_WIDTH = 512
+
+
+def image_paths() -> list:
+    """Return paths of all images which are packed into atlas."""
+    return sorted(glob('img/**/*.png', recursive=True))
+
+
+def file_paths() -> list:
+    """Return paths of all sounds and fonts which are packed as they are."""
+    return sorted(glob('sfx/*.wav') + glob('fonts/*.ttf'))
+
+
+def source_stamps() -> dict:
+    """Return modification time (ns) and size of every source file."""
+    stamps = {}
+    for path in image_paths() + file_paths():
+        info = stat(path)
+        stamps[path] = [info.st_mtime_ns, info.st_size]
+    return stamps
+
+
+def build_atlas(paths: list) -> tuple:
+    """
+    Put all images into one Surface (simple shelf packing, the tallest images
+    first). Returns atlas Surface and dict with regions of all images.
+    """
+    images = {path: load_image(path) for path in paths}
+    order = sorted(paths, key=lambda path: -images[path].get_height())
+
+    regions = {}
+    x = y = shelf_height = 0
+    for path in order:
+        width, height = images[path].get_size()
+        if x + width > ATLAS_WIDTH:  # start next shelf
+            x = 0
+            y += shelf_height + 1
+            shelf_height = 0
+        regions[path] = (x, y, width, height)
+        x += width + 1
+        shelf_height = max(shelf_height, height)
+
+    atlas = Surface((ATLAS_WIDTH, y + shelf_height), SRCALPHA, 32)
+    for path, region in regions.items():
+        atlas.blit(images[path], region[:2])
+    return atlas, regions
+
+
+def pack(output: str=ASSETS_ARCHIVE) -> None:
+    """Build archive with all images, sound effects and fonts."""
+    atlas, regions = build_atlas(image_paths())
+    buffer = BytesIO()
+    save_image(atlas, buffer, ATLAS)
+
+    files = {ATLAS: buffer.getvalue()}
+    for path in file_paths():
+        with open(path, 'rb') as f:
+            files[path] = f.read()
+
+    offsets = {}
+    data = BytesIO()
+    for path, content in files.items():
+        offsets[path] = (data.tell(), len(content))
+        data.write(content)
+
+    index = dumps({'images': regions, 'files': offsets,
+                   'sources': source_stamps()}).encode()
+    with open(output, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        f.write(data.getvalue())
+
+
+class Archive:
+    """
+    Memory-mapped asset archive. Images are handed out as subsurfaces of the
+    atlas, so all of them share one block of pixels.
+    """
+
+    def __init__(self, path: str=ASSETS_ARCHIVE) -> None:
+        """Open archive and read its index."""
+        with open(path, 'rb') as f:
+            self.data = mmap(f.fileno(), 0, access=ACCESS_READ)
+
+        magic, index_size = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not an asset archive')
+        index = loads(self.data[HEADER.size:HEADER.size + index_size])
+        self.images = index['images']
+        self.files = index['files']
+        self.sources = index.get('sources')  # missing in old archives
+        self.data_offset = HEADER.size + index_size
+
+        self.atlas = None  # it's decoded when the first image is needed
+
+    def is_current(self) -> bool:
+        """Check if no source file was added, removed or changed."""
+        return self.sources == source_stamps()
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.images or path in self.files
+
+    def file(self, path: str) -> BytesIO:
+        """Return file-like object with content of packed file."""
+        offset, size = self.files[path]
+        start = self.data_offset + offset
+        return BytesIO(self.data[start:start + size])
+
+    def image(self, path: str) -> Surface:
+        """Return image as a view of atlas."""
+        if self.atlas is None:
+            self.atlas = load_image(self.file(ATLAS), ATLAS).convert_alpha()
+        return self.atlas.subsurface(Rect(self.images[path]))
+
+
+if __name__ == '__main__':
+    pack()
+    print(f'Assets packed into {ASSETS_ARCHIVE}')
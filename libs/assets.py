@@ -0,0 +1,143 @@
+from queue import Empty, SimpleQueue
+from threading import Event, current_thread, main_thread
+from time import perf_counter
+from warnings import warn
+
+from pygame.font import Font
+from pygame.image import load as load_image
+from pygame.mixer import Sound
+from pygame.surface import Surface
+
+from .archive import Archive
+
+
+class Assets:
+    """
+    Process-wide registry of images, sounds and fonts. Every asset is loaded
+    only once and then shared by all objects which need it, so creating
+    sprites or reloading level doesn't touch the disk again.
+    Shared images must not be modified - use sprite_cache for variants.
+    When packed archive is opened, assets are taken from it instead of
+    separate files. Assets requested by other threads are still loaded on
+    main thread, because SDL objects must be created there.
+    """
+
+    def __init__(self) -> None:
+        """Initialize Assets."""
+        self.cache = {}  # (kind, path, option) -> loaded asset
+        self.archive = None
+        self.requests = SimpleQueue()  # functions to call on main thread
+
+        # statistics
+        self.loads = 0
+        self.hits = 0
+        self.load_time = 0.0  # total time spent on loading in seconds
+
+    def get(self, key: tuple, loader):
+        """Return cached asset or load it with loader and cache it."""
+        asset = self.cache.get(key)
+        if asset is not None:
+            self.hits += 1
+            return asset
+
+        start = perf_counter()
+        asset = self.cache[key] = self.on_main_thread(loader)
+        self.load_time += perf_counter() - start
+        self.loads += 1
+        return asset
+
+    def on_main_thread(self, function):
+        """
+        Call function on main thread and return its result. Other threads
+        wait until main thread calls run_requests().
+        """
+        if current_thread() is main_thread():
+            return function()
+
+        done = Event()
+        result = {}
+
+        def request() -> None:
+            try:
+                result['value'] = function()
+            except Exception as error:  # re-raised in requesting thread
+                result['error'] = error
+            done.set()
+
+        self.requests.put(request)
+        done.wait()
+        if 'error' in result:
+            raise result['error']
+        return result['value']
+
+    def run_requests(self, duration: float=0.0) -> None:
+        """
+        Call functions requested by other threads (on main thread), waiting
+        for further requests up to duration seconds.
+        """
+        end = perf_counter() + duration
+        while True:
+            try:
+                request = self.requests.get(
+                    timeout=max(end - perf_counter(), 0))
+            except Empty:
+                return
+            request()
+
+    def open_archive(self, path: str) -> None:
+        """
+        Use packed archive as a source of assets. Stale archive (sources
+        changed since it was packed) is ignored and separate files are used.
+        """
+        archive = Archive(path)
+        if not archive.is_current():
+            warn(f'{path} is out of date, using separate files '
+                 '(rebuild it with `python -m libs.archive`)')
+            return
+        self.archive = archive
+
+    def source(self, path: str):
+        """Return path or file-like object from archive."""
+        if self.archive is not None and path in self.archive:
+            return self.archive.file(path)
+        return path
+
+    def load_image(self, path: str, alpha: bool) -> Surface:
+        """Load image from archive's atlas or from separate file."""
+        if self.archive is not None and path in self.archive:
+            image = self.archive.image(path)
+            # opaque images are copied, views must keep atlas' alpha format
+            return image if alpha else image.convert()
+        if alpha:
+            return load_image(path).convert_alpha()
+        return load_image(path).convert()
+
+    def image(self, path: str, alpha: bool=True) -> Surface:
+        """Return image converted to display format (with alpha or not)."""
+        return self.get(('image', path, alpha),
+                        lambda: self.load_image(path, alpha))
+
+    def sound(self, path: str) -> Sound:
+        """Return sound effect."""
+        return self.get(('sound', path, None),
+                        lambda: Sound(self.source(path)))
+
+    def font(self, path: str, size: int) -> Font:
+        """Return font with given size."""
+        return self.get(('font', path, size),
+                        lambda: Font(self.source(path), size))
+
+    def stats(self) -> dict:
+        """Return loading statistics."""
+        requests = self.loads + self.hits
+        return {
+            'assets': len(self.cache),
+            'loads': self.loads,
+            'hits': self.hits,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'load_time': self.load_time
+        }
+
+
+# the only instance, shared by the whole game
+assets = Assets()
@@ -0,0 +1,274 @@
+from numpy import (array, ceil, concatenate, copysign, float64, frombuffer,
+                   int32, int64, maximum, minimum, zeros)
+from pygame.math import Vector2
+from pygame.sprite import Sprite
+
+from .broadphase import DynamicGroup
+from .constants import MAX_FALL_SPEED, SUBPIXEL_SHIFT, SUBPIXELS, TILE_SIZE
+from .tile_group import TileGroup
+from .vector import VectorBase
+
+MAX_STEP = TILE_SIZE / 2  # longer moves are split, so nothing skips a tile
+BODY_STATE_SIZE = 16  # bytes of packed state of one body
+
+
+def substeps(distance):
+    """
+    Return number of steps needed to move by distance without tunneling
+    (distance can be a number or an array).
+    """
+    return maximum(ceil(distance / MAX_STEP), 1).astype(int32)
+
+
+class Body(Sprite):
+    """
+    Moving object (enemy, power-up, fireball) which is moved together with
+    all other bodies of its KinematicGroup. Subclasses implement only what's
+    specific for them: reaction to tiles and behaviour before and after move.
+    """
+
+    gravity = 1.0
+    vertical_first = False  # if vertical move is done before horizontal
+
+    def __init__(self, position: tuple, speed: tuple) -> None:
+        """Initialize Body."""
+        super().__init__()
+
+        self.pos = Vector2(position)
+        self.speed = Vector2(speed)
+        self.moving = True  # if body should be moved in this tick
+
+    def collide_horizontally(self, tiles: TileGroup) -> None:
+        """Resolve collisions with tiles after horizontal move."""
+        return
+
+    def collide_vertically(self, tiles: TileGroup) -> None:
+        """Resolve collisions with tiles after vertical move."""
+        return
+
+    def after_move(self, *args) -> None:
+        """React to other objects after all bodies have moved."""
+        return
+
+
+class BodyVector(VectorBase):
+    """
+    Position or speed of one body stored in KinematicGroup's array, it can be
+    used like Vector2. Array is looked up every time, because group can
+    reallocate it when it grows. In fixed-point mode values are converted
+    from and to whole sub-pixels.
+    """
+
+    __slots__ = ('group', 'name', 'slot')
+
+    def __init__(self, group: 'KinematicGroup', name: str, slot: int) -> None:
+        self.group = group
+        self.name = name
+        self.slot = slot
+
+    def __getitem__(self, index: int) -> float:
+        value = getattr(self.group, self.name)[self.slot, index]
+        return float(value) / self.group.scale
+
+    def __setitem__(self, index: int, value: float) -> None:
+        values = getattr(self.group, self.name)
+        values[self.slot, index] = self.group.quantize(value)
+
+
+class KinematicGroup(DynamicGroup):
+    """
+    DynamicGroup which keeps positions and speeds of its bodies in contiguous
+    arrays. All bodies are moved and get gravity in one vectorized step, then
+    all of them are tested against tiles at once, and only bodies which touch
+    any tile resolve collisions in their own (Python) methods.
+    Bodies which would move further than half of a tile are moved in a few
+    shorter steps, so they can't pass through tiles or other objects.
+    In fixed-point mode positions and speeds are integers (sub-pixels) and
+    whole integration is done in integer arithmetic.
+    Sprites which aren't bodies (e.g. fire flower) are only updated.
+    """
+
+    def __init__(self, *sprites: Sprite, self_collide: bool=False,
+                 capacity: int=64, fixed_point: bool=False) -> None:
+        """Initialize KinematicGroup."""
+        self.fixed_point = fixed_point
+        self.scale = SUBPIXELS if fixed_point else 1
+        dtype = int64 if fixed_point else float64
+        self.pos = zeros((capacity, 2), dtype)
+        self.speed = zeros((capacity, 2), dtype)
+        self.size = zeros((capacity, 2), int32)
+        self.gravity = zeros(capacity)
+        self.bodies = [None] * capacity  # slot -> body
+        self.slots = {}  # body -> slot
+        self.free = list(range(capacity - 1, -1, -1))
+        super().__init__(*sprites, self_collide=self_collide)
+
+    def quantize(self, value: float):
+        """Convert value (in pixels) to value stored in arrays."""
+        if self.fixed_point:
+            return round(value * SUBPIXELS)
+        return value
+
+    def pack_state(self) -> bytes:
+        """
+        Return positions and speeds of all bodies (in order of their slots)
+        as 4 little-endian int32 sub-pixel values per body.
+        """
+        if not self.fixed_point:
+            raise ValueError('state can be packed only in fixed-point mode')
+        slots = sorted(self.slots.values())
+        state = concatenate((self.pos[slots], self.speed[slots]), 1)
+        return state.astype('<i4').tobytes()
+
+    def unpack_state(self, data: bytes) -> None:
+        """Set positions and speeds of the same bodies from pack_state()."""
+        if not self.fixed_point:
+            raise ValueError('state can be unpacked only in fixed-point mode')
+        slots = sorted(self.slots.values())
+        state = frombuffer(data, '<i4').reshape(-1, 4)
+        if len(state) != len(slots):
+            raise ValueError(f'state of {len(state)} bodies, group has '
+                             f'{len(slots)}')
+        self.pos[slots] = state[:, :2]
+        self.speed[slots] = state[:, 2:]
+        for slot, position in zip(slots,
+                                  (state[:, :2] >> SUBPIXEL_SHIFT).tolist()):
+            self.bodies[slot].rect.topleft = position
+
+    def add_internal(self, sprite: Sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        if isinstance(sprite, Body):
+            self.attach(sprite)
+
+    def remove_internal(self, sprite: Sprite) -> None:
+        super().remove_internal(sprite)
+        slot = self.slots.pop(sprite, None)
+        if slot is not None:
+            # removed body keeps its own copies of vectors
+            sprite.pos = Vector2(tuple(sprite.pos))
+            sprite.speed = Vector2(tuple(sprite.speed))
+            self.bodies[slot] = None
+            self.free.append(slot)
+
+    def attach(self, body: Body) -> None:
+        """Move body's vectors into arrays."""
+        if not self.free:
+            self.grow()
+        slot = self.free.pop()
+        self.pos[slot] = [self.quantize(value) for value in body.pos]
+        self.speed[slot] = [self.quantize(value) for value in body.speed]
+        self.size[slot] = body.rect.size
+        self.gravity[slot] = body.gravity
+        self.bodies[slot] = body
+        self.slots[body] = slot
+        body.pos = BodyVector(self, 'pos', slot)
+        body.speed = BodyVector(self, 'speed', slot)
+
+    def grow(self) -> None:
+        """Double capacity of arrays."""
+        capacity = len(self.bodies)
+        for name in ('pos', 'speed', 'size', 'gravity'):
+            old = getattr(self, name)
+            new = zeros((capacity * 2,) + old.shape[1:], old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+        self.bodies.extend([None] * capacity)
+        self.free.extend(range(capacity * 2 - 1, capacity - 1, -1))
+
+    def update(self, dt: float, tiles: TileGroup, *args) -> None:
+        """Update sprites, move all bodies and let them react to others."""
+        for sprite in self.sprites():
+            sprite.update(dt, tiles, *args)
+
+        self.move(dt, tiles, *args)
+
+    def move(self, dt: float, tiles: TileGroup, *args) -> None:
+        """
+        Move all moving bodies, every body reacts to other objects after each
+        of its steps.
+        """
+        moving = [(slot, body) for body, slot in self.slots.items()
+                  if body.moving]
+        if not moving:
+            return
+
+        slots = array([slot for slot, _ in moving])
+        speed = abs(self.speed[slots]) / self.scale
+        distance = maximum(speed[:, 0],
+                           speed[:, 1] + self.gravity[slots] * dt) * dt
+        steps = substeps(distance).tolist()
+
+        for i in range(max(steps)):
+            items = [(slot, body, dt / count)
+                     for (slot, body), count in zip(moving, steps) if count > i]
+            horizontal_first = [item for item in items
+                                if not item[1].vertical_first]
+            vertical_first = [item for item in items if item[1].vertical_first]
+
+            self.step(0, horizontal_first, tiles)
+            self.step(1, vertical_first, tiles)
+            self.step(1, horizontal_first, tiles)
+            self.step(0, vertical_first, tiles)
+
+            for _, body, _ in items:
+                if body in self.slots:  # it might have been killed
+                    body.after_move(*args)
+
+    def integrate(self, axis: int, slots, dt):
+        """Move bodies along axis. Returns their rects' positions."""
+        if axis == 1:  # apply gravity
+            self.speed[slots, 1] = minimum(
+                self.speed[slots, 1] + self.gravity[slots] * dt,
+                MAX_FALL_SPEED
+            )
+        self.pos[slots, axis] += self.speed[slots, axis] * dt
+
+        # rects are rounded the same way as pygame does it
+        pos = self.pos[slots]
+        return (pos + copysign(0.5, pos)).astype(int32)
+
+    def integrate_fixed(self, axis: int, slots, dt):
+        """Move bodies along axis in integer sub-pixels."""
+        dt = (dt * SUBPIXELS).round().astype(int64)
+        if axis == 1:  # apply gravity
+            gravity = (self.gravity[slots] * SUBPIXELS).astype(int64)
+            self.speed[slots, 1] = minimum(
+                self.speed[slots, 1] + (gravity * dt >> SUBPIXEL_SHIFT),
+                MAX_FALL_SPEED * SUBPIXELS
+            )
+        self.pos[slots, axis] += self.speed[slots, axis] * dt >> SUBPIXEL_SHIFT
+
+        # pixel is the integer part of position (like on NES)
+        return (self.pos[slots] >> SUBPIXEL_SHIFT).astype(int32)
+
+    def step(self, axis: int, items: list, tiles: TileGroup) -> None:
+        """
+        Move bodies along one axis (each with its own dt) and resolve their
+        collisions.
+        """
+        # bodies killed during previous step are skipped
+        items = [(slot, body, dt) for slot, body, dt in items
+                 if self.bodies[slot] is body]
+        if not items:
+            return
+
+        slots = array([slot for slot, _, _ in items])
+        dt = array([dt for _, _, dt in items])
+        if self.fixed_point:
+            positions = self.integrate_fixed(axis, slots, dt)
+        else:
+            positions = self.integrate(axis, slots, dt)
+        for (_, body, _), value in zip(items, positions[:, axis].tolist()):
+            if axis == 0:
+                body.rect.x = value
+            else:
+                body.rect.y = value
+
+        touching = tiles.occupied(positions, self.size[slots])
+        for (slot, body, _), touches in zip(items, touching.tolist()):
+            if not touches or self.bodies[slot] is not body:
+                continue
+            if axis == 0:
+                body.collide_horizontally(tiles)
+            else:
+                body.collide_vertically(tiles)
@@ -0,0 +1,85 @@
+from pygame.sprite import Group, Sprite, spritecollide
+
+from .constants import TILE_SIZE
+
+
+class DynamicGroup(Group):
+    """
+    Group of moving objects (enemies, coins, power-ups, fireballs) which can
+    use candidate pairs found by Broadphase instead of checking every sprite.
+    """
+
+    def __init__(self, *sprites: Sprite, self_collide: bool=False) -> None:
+        """Initialize DynamicGroup."""
+        super().__init__(*sprites)
+
+        # set by Broadphase during rebuild
+        self.broadphase = None
+        # if sprites of this group can collide with each other
+        self.self_collide = self_collide
+
+    def nearby(self, sprite: Sprite) -> list:
+        """Return sprites of this group which might collide with sprite."""
+        if self.broadphase is None or not self.broadphase.indexed(sprite):
+            return self.sprites()
+        return [other for other in self.broadphase.candidates(sprite)
+                if other in self]
+
+    def collide(self, sprite: Sprite) -> list:
+        """Return sprites of this group colliding with sprite."""
+        if self.broadphase is None or not self.broadphase.indexed(sprite):
+            return spritecollide(sprite, self, False)
+        return [other for other in self.nearby(sprite)
+                if sprite.rect.colliderect(other.rect)]
+
+
+class Broadphase:
+    """
+    Sweep-and-prune broadphase for collisions between moving objects.
+    Sprites are sorted by their left edge once per frame and only those
+    overlapping on both axes (with small margin, because objects are still
+    moving during the frame) become candidate pairs.
+    """
+
+    def __init__(self, margin: int=TILE_SIZE) -> None:
+        """Initialize Broadphase."""
+        self.margin = margin
+        self.pairs = {}  # sprite -> dict of candidate sprites (ordered set)
+        self.pairs_count = 0  # how many pairs were found in last rebuild
+
+    def indexed(self, sprite: Sprite) -> bool:
+        """Check if sprite was present during last rebuild."""
+        return sprite in self.pairs
+
+    def candidates(self, sprite: Sprite) -> tuple:
+        """Return sprites which might collide with sprite."""
+        return tuple(self.pairs.get(sprite, ()))
+
+    def rebuild(self, player: Sprite, *groups: DynamicGroup) -> None:
+        """Find candidate pairs between player and all sprites of groups."""
+        margin = self.margin
+        bodies = [(player, None)]
+        for group in groups:
+            group.broadphase = self
+            bodies.extend((sprite, group) for sprite in group)
+        bodies.sort(key=lambda body: body[0].rect.left)
+
+        self.pairs = {sprite: {} for sprite, _ in bodies}
+        self.pairs_count = 0
+
+        active = []
+        for sprite, group in bodies:
+            rect = sprite.rect
+            # drop sprites which are too far to the left from now on
+            active = [body for body in active
+                      if body[0].rect.right + margin * 2 > rect.left]
+            for other, other_group in active:
+                if other_group is group and not group.self_collide:
+                    continue
+                other_rect = other.rect
+                if (other_rect.bottom + margin * 2 > rect.top and
+                        rect.bottom + margin * 2 > other_rect.top):
+                    self.pairs[sprite][other] = None
+                    self.pairs[other][sprite] = None
+                    self.pairs_count += 1
+            active.append((sprite, group))
@@ -0,0 +1,47 @@
+from pygame.rect import Rect
+from pygame.surface import Surface
+
+from .constants import DISPLAY_SIZE, TILE_SIZE
+
+
+class Camera:
+    """
+    Visible part of the level. It's used to skip drawing and animating
+    objects which are outside the screen. It also counts how many objects
+    were drawn and skipped (culled) during current frame.
+    """
+
+    def __init__(self, margin: int=TILE_SIZE) -> None:
+        """Initialize Camera."""
+        self.width, self.height = DISPLAY_SIZE
+        self.margin = margin  # objects this close to the screen are visible
+        self.scroll = 0
+
+        # statistics of current frame
+        self.drawn = 0
+        self.culled = 0
+
+    def begin_frame(self, scroll: int) -> None:
+        """Move camera to new scroll value and reset counters."""
+        self.scroll = scroll
+        self.drawn = 0
+        self.culled = 0
+
+    def is_visible(self, rect: Rect) -> bool:
+        """Check if rect is (almost) visible on the screen."""
+        return (rect.right > self.scroll - self.margin and
+                rect.left < self.scroll + self.width + self.margin and
+                rect.bottom > -self.margin and
+                rect.top < self.height + self.margin)
+
+    def visible(self, sprites) -> list:
+        """Return visible sprites and count the ones which were culled."""
+        visible = [sprite for sprite in sprites if self.is_visible(sprite.rect)]
+        self.drawn += len(visible)
+        self.culled += len(sprites) - len(visible)
+        return visible
+
+    def draw(self, sprites, screen: Surface) -> None:
+        """Draw visible sprites onto screen."""
+        for sprite in self.visible(sprites):
+            sprite.draw(screen, self.scroll)
@@ -0,0 +1,39 @@
+class GameClock:
+    """
+    Simulation time used by all objects instead of wall-clock time. It's
+    advanced by Controller once per simulation tick, so it stops when game
+    is paused, it can be slowed down or sped up (Controller scales dt of
+    every tick) and stepped manually tick by tick while paused.
+    """
+
+    def __init__(self) -> None:
+        """Initialize GameClock."""
+        self.time = 0.0  # seconds of simulated time
+        self.paused = False
+        self.scale = 1.0  # how fast simulated time goes
+        self.steps = 0  # ticks which pass even though clock is paused
+
+    def now(self) -> float:
+        """Return current simulation time in seconds."""
+        return self.time
+
+    def tick(self, seconds: float) -> bool:
+        """
+        Advance time by one (already scaled) tick if not paused or stepped.
+        Returns if time was advanced.
+        """
+        if self.paused:
+            if not self.steps:
+                return False
+            self.steps -= 1
+        self.time += seconds
+        return True
+
+    def step(self) -> None:
+        """Let exactly one tick pass while paused."""
+        if self.paused:
+            self.steps += 1
+
+
+# the only instance, read by all objects
+game_clock = GameClock()
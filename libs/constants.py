@@ -3,8 +3,26 @@ SCALE = 4
 DISPLAY_SIZE = (256, 224)
 SCREEN_SIZE = (DISPLAY_SIZE[0] * SCALE, DISPLAY_SIZE[1] * SCALE)
 
+# files
+ASSETS_ARCHIVE = 'assets.pak'
+
+# map
+TILE_SIZE = 16
+# maps kept in memory with their state, so pipes don't have to load them
+RESIDENT_LEVELS = 2
+
 # physics
-PHYSICS_FPS = 30
+PHYSICS_FPS = 30  # speeds are in pixels per 1/PHYSICS_FPS second
+SIMULATION_FPS = 60  # simulation runs with fixed number of ticks per second
+TICK = 1 / SIMULATION_FPS
+TICK_DT = PHYSICS_FPS / SIMULATION_FPS  # dt passed to objects every tick
+MAX_FRAME_TIME = 0.25  # longer frames are slowed down, not simulated
+MAX_INTERPOLATION = 32  # longer moves (teleports) aren't interpolated
+MAX_FALL_SPEED = 8
+SLOW_MOTION = 0.25  # scale of game clock in slow motion (debug)
+# fixed-point physics mode keeps positions and speeds in 1/256 of pixel
+SUBPIXEL_SHIFT = 8
+SUBPIXELS = 1 << SUBPIXEL_SHIFT
 
 # colors
 BG_COLOR = (92, 148, 252)
@@ -16,6 +34,9 @@ WHITE = (255, 255, 255)
 # enemies' types
 GOOMBA = 0
 KOOPA = 1
+# enemies are spawned (and updated) when they are this close to the left
+# screen border
+ACTIVATION_DISTANCE = 304
 
 # states
 MENU_STATE = 0
@@ -1,29 +1,44 @@
 # TODO: don't reset level when playing for the first time (unnecessary)
 
+from collections import OrderedDict
+from io import BytesIO
+from math import ceil
 from pickle import dump, load
-from time import time
+from struct import Struct
+from threading import Thread
+from types import FunctionType
 
 from pygame import Surface
-from pygame.font import Font
-from pygame.image import load as load_image
-from pygame.math import Vector2
-from pygame.mixer import Sound, music
-from pygame.sprite import Group, Sprite
+from pygame.mixer import music
+from pygame.sprite import Sprite
 from pygame.time import Clock
 
-from libs.enemies import DeadEnemy
-
-from .coin import SpinningCoin
+from .animation import animations
+from .assets import assets
+from .bodies import BODY_STATE_SIZE, KinematicGroup
+from .broadphase import Broadphase
+from .camera import Camera
+from .clock import game_clock
 from .constants import (BG_COLOR, BLACK, GAME_OVER_STATE, LEVEL_STATE,
-                        LOADING_STATE, MENU_STATE, WHITE)
-from .debris import Debris
+                        LOADING_STATE, MAX_FALL_SPEED, MAX_INTERPOLATION,
+                        MENU_STATE, PHYSICS_FPS, RESIDENT_LEVELS,
+                        SLOW_MOTION, TILE_SIZE)
 from .debug import Debug
 from .fireball import Fireball
 from .hud import Hud
 from .level import Level
+from .particles import ParticleSystem
+from .player import STATE as PLAYER_STATE
 from .player import Mariusz
-from .points import Points
 from .powerups import FireFlower, Mushroom, OneUP
+from .sprite_cache import flipped
+from .text import TextRenderer
+
+# seconds per frame spent on loading assets for level prepared in background
+PRELOAD_BUDGET = 0.004
+
+# numbers of bodies in physics state
+PHYSICS_COUNTS = Struct('<3I')
 
 
 class Controller:
@@ -36,7 +51,8 @@ class Controller:
     def __init__(self, screen: Surface, clock: Clock) -> None:
         "Initialize Controller - 'brain' of the game."
         self.screen = screen
-        self.font = Font('fonts/PressStart2P.ttf', 8)
+        # text rendered from cached glyphs, shared by HUD, points and debug
+        self.text = TextRenderer(assets.font('fonts/PressStart2P.ttf', 8))
 
         # player variables
         self.lifes = 3
@@ -47,6 +63,9 @@ class Controller:
 
         # level variable
         self.scroll = 0
+        # integer sub-pixel physics, deterministic across platforms (it's
+        # applied when level is loaded)
+        self.fixed_point = False
 
         # spaghetti
         self.worlds = {
@@ -70,52 +89,79 @@ class Controller:
             1: 'music/smb_supermariobroshurry.mp3',
             1.5: 'music/smb_undergroundhurry.mp3',
         }
-        self.checkpoint = (1320, 184)  # TODO: this is used only for 1-1 for now
 
         # most of the images will be loaded here in the future
         self.images = {
-            'mushroom': load_image('img/mushroom.png'),
-            '1up': load_image('img/1up_mushroom.png'),
-            'debris': load_image('img/red/debris.png'),
+            'mushroom': assets.image('img/mushroom.png'),
+            '1up': assets.image('img/1up_mushroom.png'),
+            'debris': assets.image('img/red/debris.png'),
+            'spinning_coin': tuple([
+                assets.image(f'img/spinning_coin_{i}.png')
+                for i in range(4)
+            ]),
             'fire_flower': tuple([
-                load_image(f'img/flower_{i}.png').convert_alpha()
+                assets.image(f'img/flower_{i}.png')
                 for i in range(4)
             ]),
             'fireball': tuple([
-                load_image(f'img/fireball_{i}.png').convert_alpha()
+                assets.image(f'img/fireball_{i}.png')
                 for i in range(7)
             ])
         }
 
+        # recently used maps with their state: world -> (level, snapshot of
+        # just loaded level, restored after death), the oldest are dropped
+        self.levels = OrderedDict()
+        self.max_levels = RESIDENT_LEVELS
+        self.music_data = {}  # path -> content of music file
+        # thread preparing level during loading screen and its result
+        self.preloading = None
+        self.prepared = None
+        self.music_file = None  # file with currently played level music
+
         # the most important objects
-        self.level = Level(screen, self.worlds[self.world], self.theme)
+        self.level = Level(screen, self.worlds[self.world], self.theme,
+                           self.bg_colors[self.world], self.fixed_point)
         player_pos = self.level.load_level(
             self.create_spinning_coin, self.add_coin, self.create_debris,
             self.add_powerup, self.enemy_kill_animation
         )
+        self.keep_level(self.level, self.level.snapshot())
         self.player = Mariusz(screen, player_pos, 0, self.add_coin,
                               self.add_points, self.create_fireball,
                               self.remove_life, self.switch_state,
-                              self.add_life)
-        self.hud = Hud(screen, int(self.world), self.theme, self.font)
+                              self.add_life, self.level.flagpole,
+                              self.level.castle, self.level.ground,
+                              self.fixed_point)
+        # positions from previous tick, used for interpolation
+        self.previous_scroll = self.scroll
+        self.previous_player_pos = self.player.rect.topleft
+        self.hud = Hud(screen, int(self.world), self.theme, self.text)
 
         # groups
         self.enemies = self.level.enemies
-        self.floating_points = Group()
         self.coins_group = self.level.coins
         self.tiles_group = self.level.tiles
-        self.powerups = Group()
-        self.fireballs = Group()
+        self.powerups = KinematicGroup(fixed_point=self.fixed_point)
+        self.fireballs = KinematicGroup(fixed_point=self.fixed_point)
+
+        # floating points, spinning coins, debris and dead enemies
+        self.particles = ParticleSystem()
 
         # sounds
-        self.pause_sound = Sound('sfx/smb_pause.wav')
-        self.coin_sound = Sound('sfx/smb_coin.wav')
-        self.oneup_sound = Sound('sfx/smb_1-up.wav')
-        self.fireball_sound = Sound('sfx/smb_fireball.wav')
-        self.kick_sound = Sound('sfx/smb_kick.wav')
+        self.pause_sound = assets.sound('sfx/smb_pause.wav')
+        self.coin_sound = assets.sound('sfx/smb_coin.wav')
+        self.oneup_sound = assets.sound('sfx/smb_1-up.wav')
+        self.fireball_sound = assets.sound('sfx/smb_fireball.wav')
+        self.kick_sound = assets.sound('sfx/smb_kick.wav')
+        # tiles take their sounds from cache, so the first bump doesn't wait
+        for path in ('sfx/smb_bump.wav', 'sfx/smb_breakblock.wav',
+                     'sfx/smb_powerup_appears.wav'):
+            assets.sound(path)
 
         # debug object, used to display useful info during development
-        self.debug = Debug(screen, clock)
+        self.debug = Debug(screen, clock, self.text)
+        self.present_time = 0.0  # duration of presenting last frame (seconds)
 
         # when timer is 100, music is changed a few times whis is unwanted
         # that's why this switch is needed
@@ -123,6 +169,24 @@ class Controller:
 
         self.paused = False  # if game is paused
 
+        # simulation time read by all objects, advanced once per tick
+        self.game_clock = game_clock
+        self.game_clock.paused = False
+        self.stepped = False  # if the last tick was simulated while paused
+        # shared animations, all of them are advanced once per tick
+        self.animations = animations
+
+        # dirty rects mode - only changed parts of the screen are updated
+        self.dirty_rendering = False
+        self.redraw = True  # if whole screen has to be drawn in this mode
+        self.dirty_rects = None  # changed areas, None means whole screen
+        self.static_screen = None  # function drawing current static screen
+
+        # candidate pairs for collisions between moving objects
+        self.broadphase = Broadphase()
+        # visible part of the level, used to skip off-screen objects
+        self.camera = Camera()
+
         # Okay, now I'm doing some spaghetti. It's my first time with these
         self.states = {
             MENU_STATE: self.menu_state,
@@ -130,12 +194,18 @@ class Controller:
             LEVEL_STATE: self.level_state,
             GAME_OVER_STATE: self.game_over_state
         }
+        # functions drawing screens which don't change (much)
+        self.screens = {
+            MENU_STATE: self.draw_menu_screen,
+            LOADING_STATE: self.draw_loading_screen,
+            GAME_OVER_STATE: self.draw_game_over_screen
+        }
         self.current_state = MENU_STATE
-        self.switch_time = time()  # TODO: change this later
+        self.switch_time = self.game_clock.now()
 
         # TODO: this might be temporary
         self.screen = screen
-        self.menu_image = load_image('img/menu.png').convert()
+        self.menu_image = assets.image('img/menu.png', False)
 
         # load highscore
         try:
@@ -146,21 +216,19 @@ class Controller:
             with open('highscore', 'wb') as f:
                 dump(self.highscore, f)
 
-        # more spaghetti
-        # these are 'portals' between maps - special colliders on pipes
-        self.portals = {
-            1: (928, 128, 'down'),
-            1.5: (206, 199, 'right')
-        }
         # TODO: change this in the future, for now it will work
         self.previous_level = None
-        self.checkpoint = False
+        self.checkpoint = False  # if checkpoint of current map was reached
 
     def enemy_kill_animation(self, sprite: Sprite, add_points: bool=True) -> None:
-        self.floating_points.add(DeadEnemy(sprite.image, sprite.rect))
+        # dead enemy falls upside down
+        dead_enemy = self.particles.register(
+            ('dead_enemy', sprite.image), (flipped(sprite.image, False, True),)
+        )
+        self.particles.emit(dead_enemy, sprite.rect.topleft, (0, -4), 1)
         self.kick_sound.play()
         if add_points:
-            self.floating_points.add(Points((sprite.rect.x, sprite.rect.y), 100))
+            self.create_floating_points(sprite.rect.topleft, 100)
         sprite.kill()
 
     def reset_level(self, change_level: bool=False) -> None:
@@ -168,52 +236,148 @@ class Controller:
         # TEMPORARY!!!
         self.theme = self.themes[self.world]
 
-        if not self.dont_play_music:
-            music.load(self.music[self.world])
+        # level prepared during loading screen is just swapped in (thread
+        # which wasn't started is dropped and level is prepared here)
+        if self.preloading is not None:
+            while self.preloading.is_alive():  # it may wait for assets
+                assets.run_requests(PRELOAD_BUDGET)
+            self.preloading = None
+        prepared, self.prepared = self.prepared, None
+        if prepared is None:
+            prepared = self.prepare_level(self.world, self.fixed_point,
+                                          not self.dont_play_music,
+                                          change_level)
+        self.level, player_pos, music_file, fixed_point = prepared
+
+        if music_file is not None:
+            self.music_file = music_file  # music is streamed from it
+            music.load(music_file, self.music[self.world].split('.')[-1])
             music.play(-1)
-        # the most important objects
-        self.level = Level(self.screen, self.worlds[self.world], self.theme)
-        player_pos = self.level.load_level(
-            self.create_spinning_coin, self.add_coin, self.create_debris,
-            self.add_powerup, self.enemy_kill_animation
-        )
         self.player = Mariusz(self.screen, player_pos, self.player_size, self.add_coin,
                               self.add_points, self.create_fireball,
                               self.remove_life, self.switch_state,
-                              self.add_life)
+                              self.add_life, self.level.flagpole,
+                              self.level.castle, self.level.ground,
+                              fixed_point)
         if not change_level:
-            self.hud = Hud(self.screen, int(self.world), self.theme, self.font)
-            # TODO: proper checkpoint (why I'm even doing this)
-            if self.world == 1 and self.checkpoint:
-                self.player.rect.x = 1320
-                self.player.pos.x = 1320
-                self.player.rect.y = 184
-                self.player.pos.y = 184
-        else:
-            # TODO: change this in the future, for now it will work
-            if self.world == 1 and self.previous_level == 1.5:
-                # pipe exit
-                self.player.rect.x = 2616
-                self.player.pos.x = 2616
-                self.player.rect.y = 152
-                self.player.pos.y = 152
+            self.hud = Hud(self.screen, int(self.world), self.theme, self.text)
+            if self.checkpoint and self.level.checkpoint:
+                self.place_player(self.level.checkpoint)
+        elif self.previous_level is not None:
+            # pipe exit
+            entrance = self.level.entrances.get(
+                self.worlds[self.previous_level])
+            if entrance:
+                self.place_player(entrance)
 
         # groups
         self.enemies = self.level.enemies
-        self.floating_points = Group()
+        self.particles.clear()
         self.coins_group = self.level.coins
         self.tiles_group = self.level.tiles
-        self.powerups = Group()
-        self.fireballs = Group()
+        self.powerups = KinematicGroup(fixed_point=fixed_point)
+        self.fireballs = KinematicGroup(fixed_point=fixed_point)
 
         self.dont_change_music = False
         self.paused = False  # if game is paused
-        self.switch_time = time()  # TODO: change this later
+        self.game_clock.paused = False
+        self.switch_time = self.game_clock.now()
         self.scroll = 0
+        self.previous_scroll = self.scroll
+        self.previous_player_pos = self.player.rect.topleft
 
         self.end_time = 0
         self.dont_play_music = False
 
+    def prepare_level(self, world: float, fixed_point: bool, play_music: bool,
+                      change_level: bool=False) -> tuple:
+        """
+        Get level of given world and its music. Map left through a pipe is
+        kept in memory, so going back just swaps it in. After death, kept
+        maps are restored from their snapshots. It runs in background only
+        during loading screen, when no level is used by main thread (assets
+        are still loaded on main thread).
+        Returns level, player position, music file (None if music shouldn't
+        be played) and physics mode.
+        """
+        name = self.worlds[world]
+        music_path = self.music[world]
+        if any(level.enemies.fixed_point != fixed_point
+               for level, _ in self.levels.values()):
+            self.levels.clear()  # physics mode has changed
+
+        if name in self.levels:
+            level, snapshot = self.levels[name]
+            if change_level:  # the map is just as player left it
+                player_pos = level.start_position()
+            else:
+                player_pos = level.restore(snapshot)
+        else:
+            level = Level(self.screen, name, self.themes[world],
+                          self.bg_colors[world], fixed_point)
+            player_pos = level.load_level(
+                self.create_spinning_coin, self.add_coin, self.create_debris,
+                self.add_powerup, self.enemy_kill_animation
+            )
+            snapshot = level.snapshot()
+        if not change_level:
+            for other, other_snapshot in self.levels.values():
+                if other is not level:
+                    other.restore(other_snapshot)
+        self.keep_level(level, snapshot)
+
+        music_file = None
+        if play_music:
+            if music_path not in self.music_data:
+                with open(music_path, 'rb') as f:
+                    self.music_data[music_path] = f.read()
+            music_file = BytesIO(self.music_data[music_path])
+        return level, player_pos, music_file, fixed_point
+
+    def keep_level(self, level: Level, snapshot: dict) -> None:
+        """Keep level as the most recently used, drop the oldest ones."""
+        self.levels[level.world] = (level, snapshot)
+        self.levels.move_to_end(level.world)
+        while len(self.levels) > self.max_levels:
+            self.levels.popitem(last=False)
+
+    def preload_level(self, world: float, fixed_point: bool,
+                      play_music: bool) -> None:
+        """Prepare level in background thread."""
+        self.prepared = self.prepare_level(world, fixed_point, play_music)
+
+    def physics_state(self) -> bytes:
+        """
+        Return compact state of player and all bodies (in fixed-point mode),
+        e.g. to compare runs: numbers of enemies, power-ups and fireballs,
+        then their packed states.
+        """
+        groups = (self.enemies, self.powerups, self.fireballs)
+        return b''.join((
+            PHYSICS_COUNTS.pack(*[len(group.slots) for group in groups]),
+            self.player.pack_state(),
+            *[group.pack_state() for group in groups]
+        ))
+
+    def set_physics_state(self, data: bytes) -> None:
+        """
+        Restore player and all bodies from physics_state() (the same bodies
+        have to exist).
+        """
+        groups = (self.enemies, self.powerups, self.fireballs)
+        counts = PHYSICS_COUNTS.unpack_from(data)
+        offset = PHYSICS_COUNTS.size + PLAYER_STATE.size
+        self.player.unpack_state(data[PHYSICS_COUNTS.size:offset])
+        for group, count in zip(groups, counts):
+            size = count * BODY_STATE_SIZE
+            group.unpack_state(data[offset:offset + size])
+            offset += size
+
+    def place_player(self, position: tuple) -> None:
+        """Move player to position from level's metadata."""
+        self.player.rect.topleft = position
+        self.player.pos.x, self.player.pos.y = position
+
     def reset_game(self) -> None:
         self.reset_level()
         self.lifes = 3
@@ -263,8 +427,10 @@ class Controller:
             self.create_floating_points(pos, amount)
 
     def create_floating_points(self, position: tuple, amount: int) -> None:
-        """Create floating points sprite and add it to the group."""
-        self.floating_points.add(Points(position, amount))
+        """Create floating points particle, it disappears after a second."""
+        points = self.particles.register(('points', amount),
+                                         (self.text.render(str(amount)),))
+        self.particles.emit(points, position, (0, -1), lifetime=1)
 
     def create_fireball(self, position: tuple, direction: int) -> None:
         self.fireballs.add(Fireball(self.images['fireball'], position,
@@ -282,67 +448,128 @@ class Controller:
 
     def create_spinning_coin(self, position: tuple) -> None:
         """Create spinning coin from question block."""
-        self.floating_points.add(
-            SpinningCoin(position, self.create_floating_points)
+        coin = self.particles.register(
+            'spinning_coin', self.images['spinning_coin'], 0.05,
+            lambda x, y: self.create_floating_points((x - 8, y), 200)
         )
+        self.particles.emit(coin, position, (0, -8), 1, 0.5)
 
     def create_debris(self, pos: tuple) -> None:
         """Create brick fragments from destroying brick."""
-        self.floating_points.add(
-            Debris((pos[0] - 8, pos[1] - 8), self.images['debris'], Vector2(-1, -12), False),
-            Debris((pos[0] + 8, pos[1] - 8), self.images['debris'], Vector2(1, -12), True),
-            Debris((pos[0] - 8, pos[1] + 8), self.images['debris'], Vector2(-1, -10), False),
-            Debris((pos[0] + 8, pos[1] + 8), self.images['debris'], Vector2(1, -10), True)
-        )
+        image = self.images['debris']
+        frames = (image, flipped(image, False, True))
+        # fragments flip every 0.1 s, right ones start flipped
+        left = self.particles.register('debris', frames, 0.1)
+        right = self.particles.register('debris_flipped', frames[::-1], 0.1)
+        width, height = image.get_size()
+        for x, y, speed_x, speed_y, sprite_id in (
+                (-8, -8, -1, -12, left), (8, -8, 1, -12, right),
+                (-8, 8, -1, -10, left), (8, 8, 1, -10, right)):
+            self.particles.emit(sprite_id, (pos[0] + x - width // 2,
+                                            pos[1] + y - height // 2),
+                                (speed_x, speed_y), 1)
         self.add_points(50, False)
 
     def pause(self) -> None:
         """Pause game and music. Also play pausing sound."""
         self.paused = not self.paused
+        self.game_clock.paused = self.paused
+        self.game_clock.steps = 0
         self.pause_sound.play()
         if music.get_busy():
             music.pause()
         else:
             music.unpause()
 
-    def menu_state(self, _) -> None:
-        """Update and draw all things related to menu."""
+    def step(self) -> None:
+        """Simulate exactly one tick while game is paused."""
+        self.game_clock.step()
 
+    def toggle_slow_motion(self) -> None:
+        """Switch between normal speed and slow motion of whole game."""
+        if self.game_clock.scale == 1.0:
+            self.game_clock.scale = SLOW_MOTION
+        else:
+            self.game_clock.scale = 1.0
+
+    def draw_static_screen(self, draw: FunctionType) -> None:
+        """
+        Draw screen which doesn't change except for HUD (menu, loading and
+        game over screen). In dirty rects mode the whole screen is drawn only
+        after switching state, later only areas changed in HUD are redrawn.
+        """
+        self.static_screen = draw
+        if self.dirty_rendering and not self.redraw:
+            dirty_rects = self.hud.pop_dirty_rects()
+            for rect in dirty_rects:
+                self.screen.set_clip(rect)
+                draw()
+            self.screen.set_clip(None)
+            self.dirty_rects.extend(dirty_rects)
+        else:
+            draw()
+            self.hud.pop_dirty_rects()
+            self.redraw = False
+            self.dirty_rects = None
+
+    def draw_menu_screen(self) -> None:
+        """Draw menu image, highscore and HUD."""
         self.screen.blit(self.menu_image, (0, 0))
-        surf = self.font.render(str(self.highscore).zfill(6), False, WHITE)
+        surf = self.text.render(str(self.highscore).zfill(6))
         self.screen.blit(surf, (136, 176))
 
+        self.hud.draw()
+
+    def menu_state(self, _) -> None:
+        """Update all things related to menu."""
         self.hud.update(self.coins, self.points)
         self.hud.update_coin_indicator()
 
+    def draw_loading_screen(self) -> None:
+        """Draw world, lifes and HUD onto black screen."""
+        self.screen.fill(BLACK)
+        self.hud.draw_loading_screen_exclusive(self.lifes)
+
         self.hud.draw()
 
     def loading_state(self, _) -> None:
-        """Update and draw all objects and groups related to loading screen."""
-        if time() - self.switch_time >= 3:
+        """Update all objects and groups related to loading screen."""
+        if self.preloading is not None:
+            if self.preloading.ident is None:  # not started yet
+                self.preloading.start()
+            if self.preloading.is_alive():
+                # assets of level prepared in background are loaded here
+                assets.run_requests(PRELOAD_BUDGET)
+        if (self.game_clock.now() - self.switch_time >= 3 and
+                (self.preloading is None or not self.preloading.is_alive())):
             self.switch_state(LEVEL_STATE)
             return
 
-        self.screen.fill(BLACK)
-
         self.hud.update(self.coins, self.points)
-        self.hud.draw_loading_screen_exclusive(self.lifes)
-
-        self.hud.draw()
 
     def level_state(self, dt: float) -> None:
-        """Update and draw all objects and groups related to level."""
-        if self.paused:  # don't update game if paused
+        """Update all objects and groups related to level."""
+        if self.paused and not self.stepped:  # don't update game if paused
             return
 
-        self.screen.fill(self.bg_colors[self.world])  # clear screen Surface
-        self.level.draw(self.scroll)  # draw all tiles
-        
-        # update floating points, spinning coins and debris
-        self.floating_points.update(dt)
+        # positions from before this tick, used for interpolation
+        self.previous_scroll = self.scroll
+        self.previous_player_pos = self.player.rect.topleft
+
+        # update floating points, spinning coins, debris and dead enemies
+        self.particles.update(dt)
 
         # this section is skipped when player is dead or took power-up
         if self.player.is_alive and not self.player.is_upgrading:
+            # create enemies which have come close to the screen
+            self.level.spawn_enemies(self.scroll)
+
+            # find objects which might collide during this frame, margin has
+            # to cover the longest possible move
+            self.broadphase.margin = max(TILE_SIZE, ceil(MAX_FALL_SPEED * dt))
+            self.broadphase.rebuild(self.player, self.enemies, self.fireballs,
+                                    self.coins_group, self.powerups)
+
             # update positions
             self.powerups.update(dt, self.tiles_group)
             self.fireballs.update(dt, self.tiles_group, self.enemies, self.scroll)
@@ -350,7 +577,7 @@ class Controller:
                                 self.scroll)
             if self.player.update(dt, self.coins_group, self.tiles_group,
                                   self.enemies, self.powerups, self.scroll,
-                                  self.portals[self.world]):
+                                  self.level.portal):
                 self.previous_level = self.world
                 if isinstance(self.world, int):
                     self.world += 0.5
@@ -358,8 +585,8 @@ class Controller:
                     self.world = int(self.world - 0.5)
                 self.reset_level(change_level=True)
 
-            # TODO: proper checkpoint, for now this will work
-            if self.player.rect.x >= 1320:
+            checkpoint = self.level.checkpoint
+            if checkpoint and self.player.rect.x >= checkpoint[0]:
                 self.checkpoint = True
 
             # update HUD content - points, coins and time
@@ -370,9 +597,9 @@ class Controller:
                 self.points += self.hud.subtract_time()
                 if self.hud.timer == 0:
                     if self.end_time == 0 and not music.get_busy():
-                        self.end_time = time()
+                        self.end_time = self.game_clock.now()
                     if self.end_time != 0:
-                        if time() - self.end_time >= 2:
+                        if self.game_clock.now() - self.end_time >= 2:
                             self.switch_state(MENU_STATE)
             # play hurry music
             elif self.hud.timer == 100:
@@ -395,41 +622,80 @@ class Controller:
         # it's independent because it should be updated e.g. after death
         self.hud.update_coin_indicator()
 
-        # draw objects onto screen Surface
-        for enemy in self.enemies:
-            enemy.draw(self.screen, self.scroll)
-        for points in self.floating_points:
-            points.draw(self.screen, self.scroll)
-        self.player.draw(self.scroll)
-        self.hud.draw()
-        self.coins_group.update(self.screen, self.scroll)
-        for powerup in self.powerups:
-            powerup.draw(self.screen, self.scroll)
         self.tiles_group.update()
-        for fireball in self.fireballs:
-            fireball.draw(self.screen, self.scroll)
 
         # update scroll
-        if isinstance(self.world, float):
-            return  # I don't want to update scroll when on extra map
+        if not self.level.scrolling:
+            return  # e.g. extra map fits into the screen
         if self.player.rect.x - 128 >= self.scroll:
             self.scroll = self.player.rect.x - 128
 
-    def game_over_state(self, _) -> None:
-        """Update and draw all things related to game over screen."""
+    def interpolate(self, previous: int, current: int, alpha: float) -> int:
+        """
+        Return position between previous and current tick. Teleports (pipes,
+        checkpoints) aren't interpolated.
+        """
+        if abs(current - previous) > MAX_INTERPOLATION:
+            return current
+        return round(previous + (current - previous) * alpha)
 
-        self.screen.fill(BLACK)
+    def draw_level(self, alpha: float) -> None:
+        """
+        Draw all objects related to level. Scroll and player are drawn
+        between their positions from previous and current tick.
+        """
+        if self.paused:
+            if not self.stepped:
+                return
+            # tick simulated while paused is shown without interpolation
+            self.stepped = False
+            alpha = 1.0
+
+        scroll = self.interpolate(self.previous_scroll, self.scroll, alpha)
+        player_pos = (
+            self.interpolate(self.previous_player_pos[0], self.player.rect.x,
+                             alpha),
+            self.interpolate(self.previous_player_pos[1], self.player.rect.y,
+                             alpha)
+        )
 
-        self.hud.update(self.coins, self.points)
+        # skip everything outside the screen from now on
+        self.camera.begin_frame(scroll)
+        self.level.draw(self.camera)  # draw background and all tiles
+
+        # draw visible objects onto screen Surface
+        self.camera.draw(self.enemies, self.screen)
+        self.particles.draw(self.screen, self.camera)
+        self.player.draw(scroll, player_pos)
+        self.hud.draw()
+        for coin in self.camera.visible(self.coins_group):
+            coin.update(self.screen, scroll)
+        self.camera.draw(self.powerups, self.screen)
+        self.camera.draw(self.fireballs, self.screen)
+
+        # whole screen is redrawn, so HUD changes don't have to be tracked
+        self.hud.pop_dirty_rects()
+        self.dirty_rects = None
+
+    def draw_game_over_screen(self) -> None:
+        """Draw game over text and HUD onto black screen."""
+        self.screen.fill(BLACK)
         self.hud.draw_game_over_screen_exclusive()
 
         self.hud.draw()
 
-        if time() - self.switch_time >= 7:
+    def game_over_state(self, _) -> None:
+        """Update all things related to game over screen."""
+        self.hud.update(self.coins, self.points)
+
+        if self.game_clock.now() - self.switch_time >= 7:
             self.switch_state(MENU_STATE)
 
     def switch_state(self, state: int) -> None:
         """Swich current game state. Used in children objects, e.g. Player."""
+        # new state has to be drawn from scratch
+        self.redraw = True
+
         if self.lifes > 0 or state == MENU_STATE:
             self.current_state = state
         else:
@@ -438,15 +704,25 @@ class Controller:
         if self.current_state == LOADING_STATE:
             self.dont_play_music = False
             music.pause()
+            self.hud.hide_timer()
             self.hud.update_world(int(self.world))
             self.hud.half_reset()
-            self.switch_time = time()
+            self.switch_time = self.game_clock.now()
+            # level is built while loading screen is shown, thread is started
+            # by loading state (this can be called during level's tick, which
+            # still uses the level); settings are passed, they can be changed
+            # while it's running
+            self.preloading = Thread(
+                target=self.preload_level, daemon=True,
+                args=(self.world, self.fixed_point, not self.dont_play_music)
+            )
         elif self.current_state == LEVEL_STATE:
             self.reset_level()  # TEMPORARY
         elif self.current_state == GAME_OVER_STATE:
+            self.hud.hide_timer()
             music.load('music/smb_gameover.wav')
             music.play()
-            self.switch_time = time()
+            self.switch_time = self.game_clock.now()
             # save score
             if self.points > self.highscore:
                 with open('highscore', 'wb') as f:
@@ -461,9 +737,48 @@ class Controller:
                     self.highscore = self.points
             self.reset_game()
 
-    def run(self, dt: float) -> None:
-        """Run current state."""
+    def update(self, dt: float) -> None:
+        """
+        Update current state by one simulation tick. Dt is scaled with game
+        clock, so the whole simulation is slowed down or sped up together.
+        """
+        dt *= self.game_clock.scale
+        if not self.game_clock.tick(dt / PHYSICS_FPS):
+            return  # paused
+        self.stepped = self.paused  # single tick while paused
+        self.animations.update(self.game_clock.now())
         self.states[self.current_state](dt)
 
+    def draw(self, alpha: float=1.0) -> list | None:
+        """
+        Draw current state. Alpha is a fraction of time between the last and
+        the next simulation tick. Returns list of changed areas of the screen
+        or None if the whole screen has changed.
+        """
+        self.dirty_rects = [] if self.dirty_rendering else None
+        if self.current_state == LEVEL_STATE:
+            self.draw_level(alpha)
+        else:
+            self.draw_static_screen(self.screens[self.current_state])
+
         # temporary, I'm using it only during development
-        self.debug.draw()
+        if self.current_state == LEVEL_STATE:
+            # loading phases: read, index, build, static (milliseconds)
+            load_times = ' '.join(
+                f'{phase[0].upper()}{time * 1000:.1f}'
+                for phase, time in self.level.load_times.items()
+                if phase != 'total'
+            )
+            self.debug.draw(f'CULLED {self.camera.culled}',
+                            f'PRESENT {self.present_time * 1000:.1f}MS',
+                            f'LOAD {load_times}')
+        else:
+            if self.dirty_rects is not None:
+                # clear previous FPS before drawing the new one
+                self.screen.set_clip(self.debug.area)
+                self.static_screen()
+                self.screen.set_clip(None)
+                self.dirty_rects.append(self.debug.area)
+            self.debug.draw()
+
+        return self.dirty_rects
@@ -1,20 +1,30 @@
-from pygame.font import Font
+from pygame.rect import Rect
 from pygame.surface import Surface
 from pygame.time import Clock
 
 from .constants import RED
+from .text import TextRenderer
 
 
 class Debug:
-    """Debug object used for displaying current FPS."""
+    """Debug object used for displaying current FPS and additional info."""
 
-    def __init__(self, screen: Surface, clock: Clock) -> None:
+    def __init__(self, screen: Surface, clock: Clock,
+                 text: TextRenderer) -> None:
         """Initialize Debug."""
         self.screen = screen
         self.clock = clock
-        self.font = Font("fonts/PressStart2P.ttf", 8)
+        self.text = text
 
-    def draw(self) -> None:
-        """Create Surface with current FPS and draw it onto screen."""
-        surf = self.font.render(str(int(self.clock.get_fps())), False, RED)
-        self.screen.blit(surf, (0, 0))
+        # area used by FPS counter
+        self.area = Rect(0, 0, 5 * text.glyph_width, text.glyph_height)
+
+    def draw(self, *info: str) -> None:
+        """
+        Draw current FPS onto screen. Every additional info is drawn in the
+        next line.
+        """
+        self.text.draw(self.screen, str(int(self.clock.get_fps())), (0, 0), RED)
+
+        for line, text in enumerate(info, 1):
+            self.text.draw(self.screen, text, (0, line * 8), RED)
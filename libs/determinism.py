@@ -0,0 +1,81 @@
+# Determinism check of fixed-point physics. The first level is played twice
+# with the same scripted input and packed physics state of both runs (player,
+# enemies, power-ups and fireballs) is compared after every tick. The second
+# run restores every state right after packing it, so anything which isn't
+# captured by the packed state would make the runs differ.
+# Run `python -m libs.determinism`.
+
+from hashlib import md5
+from os import environ
+
+import pygame
+from pygame.constants import K_RIGHT, K_a
+
+from .clock import game_clock
+from .constants import DISPLAY_SIZE, LEVEL_STATE, LOADING_STATE, TICK_DT
+from .controller import Controller
+
+TICKS = 1800
+
+
+class ScriptedKeys:
+    """Held keys at given tick: running right, sometimes sprinting."""
+
+    def __init__(self, tick: int) -> None:
+        """Initialize ScriptedKeys."""
+        self.held = {K_RIGHT}
+        if tick % 300 >= 150:
+            self.held.add(K_a)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.held
+
+
+def play(ticks: int, restore: bool) -> list:
+    """
+    Play level in fixed-point mode and return its packed physics state after
+    every tick. Level is started again after death.
+    """
+    game_clock.time = 0.0
+    controller = Controller(pygame.Surface(DISPLAY_SIZE), pygame.time.Clock())
+    controller.fixed_point = True
+
+    states = []
+    for tick in range(ticks):
+        if controller.current_state != LEVEL_STATE:
+            controller.dont_play_music = True
+            controller.switch_state(LOADING_STATE)
+            controller.switch_state(LEVEL_STATE)
+
+        player = controller.player
+        player.held_keys = lambda: ScriptedKeys(tick)
+        if tick % 40 == 0:
+            player.jump()
+        elif tick % 40 == 20:
+            player.can_jump = False
+            player.hold_jump = False
+
+        controller.update(TICK_DT)
+        state = controller.physics_state()
+        if restore:
+            controller.set_physics_state(state)
+        states.append(state)
+    return states
+
+
+if __name__ == '__main__':
+    # nothing is shown or played
+    environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+    first = play(TICKS, False)
+    second = play(TICKS, True)
+    for tick, (a, b) in enumerate(zip(first, second)):
+        if a != b:
+            print(f'Runs differ after tick {tick}')
+            raise SystemExit(1)
+    digest = md5(b''.join(first)).hexdigest()
+    print(f'{TICKS} ticks deterministic, state {digest} '
+          f'({sum(map(len, first)) // TICKS} bytes per tick)')
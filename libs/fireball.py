@@ -1,69 +1,56 @@
-from time import time
 from types import FunctionType
 
-from pygame.math import Vector2
-from pygame.sprite import Group, Sprite, spritecollide
+from pygame.sprite import Group
 from pygame.surface import Surface
-from pygame.mixer import Sound
 
+from .assets import assets
+from .bodies import Body
+from .clock import game_clock
 from .constants import KOOPA
 
 
-class Fireball(Sprite):
+class Fireball(Body):
+    # it bounces off the floor before checking walls
+    vertical_first = True
+
     def __init__(self, images: tuple, position: tuple, direction: int,
                  add_points: FunctionType) -> None:
-        super().__init__()
+        super().__init__(position, (direction * 6, 0))
 
         self.frame = 0
         self.images = images
         self.image: Surface = self.images[0]
-        self.last_time = time()
+        self.last_time = game_clock.now()
 
         self.rect = self.image.get_rect(topleft=position)
-        self.pos = Vector2(position)
-        self.speed = Vector2(direction * 6, 0)
 
         self.add_points = add_points
 
-        self.kick_sound = Sound('sfx/smb_kick.wav')
-
-    def move_horizontally(self, dt: float) -> None:
-        "Change horizontal position of the fireball."
-        self.pos.x += self.speed.x * dt
-        self.rect.x = self.pos.x
-
-    def move_vertically(self, dt: float) -> None:
-        "Apply gravity and change vertical position of the enemy."
-        self.speed.y = min(self.speed.y + 1 * dt, 8)
-
-        self.pos.y += self.speed.y * dt
-        self.rect.y = self.pos.y
+        self.kick_sound = assets.sound('sfx/smb_kick.wav')
 
-    def check_horizontal_collisions(self, tiles: Group) -> None:
+    def collide_horizontally(self, tiles: Group) -> None:
         """Check horizontal collisions with map tiles and adjust position."""
-        for tile in tiles:
-            if self.rect.colliderect(tile.rect):
-                # TODO: explosion animation
-                self.kick_sound.play()
-                self.kill()
+        for tile in tiles.colliding(self.rect):
+            # TODO: explosion animation
+            self.kick_sound.play()
+            self.kill()
 
-    def check_vertical_collisions(self, tiles: Group) -> None:
+    def collide_vertically(self, tiles: Group) -> None:
         """Check vertical collisions with map tiles and adjust position."""
-        for tile in tiles:
-            if self.rect.colliderect(tile.rect):
-                if self.speed.y > 0:  # touching floor
-                    self.rect.bottom = tile.rect.top
-                    self.pos.y = self.rect.y
-                    self.speed.y = -4
-                else:  # touching ceiling
-                    # TODO: explosion animation
-                    self.kill()
+        for tile in tiles.colliding(self.rect):
+            if self.speed.y > 0:  # touching floor
+                self.rect.bottom = tile.rect.top
+                self.pos.y = self.rect.y
+                self.speed.y = -4
+            else:  # touching ceiling
+                # TODO: explosion animation
+                self.kill()
                 
-                return  # finish looking for collisions
+            return  # finish looking for collisions
 
     def check_enemy_collisions(self, enemies: Group) -> None:
         """Check collisions with enemies. Kill enemy when collision occurs."""
-        enemy_collisions = spritecollide(self, enemies, False)
+        enemy_collisions = enemies.collide(self)
 
         if enemy_collisions:
             enemy = enemy_collisions[0]
@@ -81,8 +68,8 @@ class Fireball(Sprite):
             return  # fireball kills only one enemy
 
     def update_animation(self) -> None:
-        if time() - self.last_time >= 0.1:
-            self.last_time = time()
+        if game_clock.now() - self.last_time >= 0.1:
+            self.last_time = game_clock.now()
             self.frame += 1
             if self.frame > 3:
                 self.frame = 0
@@ -94,14 +81,7 @@ class Fireball(Sprite):
 
         self.update_animation()
 
-        # change vertical position
-        self.move_vertically(dt)
-        self.check_vertical_collisions(tiles)
-
-        # change horizontal position
-        self.move_horizontally(dt)
-        self.check_horizontal_collisions(tiles)
-
+    def after_move(self, enemies: Group, scroll: int) -> None:
         self.check_enemy_collisions(enemies)
 
     def draw(self, screen: Surface, scroll: int):
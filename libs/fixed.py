@@ -0,0 +1,30 @@
+from .constants import SUBPIXELS
+from .vector import VectorBase
+
+
+class FixedVector(VectorBase):
+    """
+    Vector with integer sub-pixel coordinates (1/SUBPIXELS of pixel), used
+    instead of Vector2 in fixed-point physics mode. It can be used like
+    Vector2, but every assigned value is rounded to whole sub-pixels, so
+    state of objects doesn't depend on floating point rounding and it's
+    stored as two small integers.
+    """
+
+    __slots__ = ('raw_x', 'raw_y')
+
+    def __init__(self, x: float=0, y: float=0) -> None:
+        """Initialize FixedVector."""
+        if isinstance(x, (tuple, list)):
+            x, y = x
+        self.raw_x = round(x * SUBPIXELS)
+        self.raw_y = round(y * SUBPIXELS)
+
+    def __getitem__(self, index: int) -> float:
+        return (self.raw_x, self.raw_y)[index] / SUBPIXELS
+
+    def __setitem__(self, index: int, value: float) -> None:
+        if index == 0:
+            self.raw_x = round(value * SUBPIXELS)
+        else:
+            self.raw_y = round(value * SUBPIXELS)
@@ -1,12 +1,13 @@
 from math import ceil
-from time import time
 
 from pygame.constants import SRCALPHA
-from pygame.font import Font
-from pygame.image import load as load_image
 from pygame.surface import Surface
 
-from .constants import BLACK, TRANSPARENT, WHITE
+from .animation import animations
+from .assets import assets
+from .clock import game_clock
+from .constants import BLACK, TRANSPARENT
+from .text import TextRenderer
 
 
 class Hud:
@@ -14,57 +15,94 @@ class Hud:
     Class responsible for displaying points, coins, current world and time.
     It doesn't have logic to kill Mariusz when time is up or add extra life
     after collecting 100 coins. It only shows information.
+    HUD is retained - every field is redrawn only when its value changes,
+    and areas of changed fields are collected as dirty rects.
     """
 
     def __init__(self, screen: Surface, world: int, theme: str,
-                 font: Font) -> None:
+                 text: TextRenderer) -> None:
         """Initialize HUD."""
         self.screen = screen
-        self.last_time = time()
-        self.font = font
+        self.last_time = game_clock.now()
+        self.text = text
 
         self.timer = 400
 
         self.labels = (  # labels and their positions
-            (self.font.render('MARIUSZ', False, WHITE), (8, 0)),
-            (self.font.render('WORLD', False, WHITE), (128, 0)),
-            (self.font.render('TIME', False, WHITE), (184, 0))
+            (self.text.render('MARIUSZ'), (8, 0)),
+            (self.text.render('WORLD'), (128, 0)),
+            (self.text.render('TIME'), (184, 0))
         )
 
         # coin indicator stuff
         self.coin_surfs = [  # coin images used for animation
-            load_image(f'img/{theme}/mini_coin_{i}.png').convert_alpha()
+            assets.image(f'img/{theme}/mini_coin_{i}.png')
             for i in range(3)
         ]
         self.coin_surf = self.coin_surfs[0]
-        self.coin_animation = [(0, 0.45), (1, 0.15), (2, 0.15), (1, 0.15)]
-        self.coin_frame = 0
-        self.coin_timer = time()
+        self.coin_animation = animations['blink']
+
+        # HUD surface for easier positioning
+        self.surface = Surface((224, 16), SRCALPHA)
+        self.surface.fill(TRANSPARENT)
+        self.position = (16, 8)  # position of HUD surface on the screen
+        # labels never change, so they're drawn only once
+        for label, pos in self.labels:
+            self.surface.blit(label, pos)
+
+        self.fields = {}  # field name -> currently displayed value
+        self.field_rects = {}  # field name -> area on HUD surface
+        self.dirty_rects = []  # changed areas (screen coordinates)
 
         self.world = None  # later it'll be a rendered Surface
         self.update_world(world)  # create Surface with world number
 
-        self.loading_screen_coin = load_image('img/blue/mini_coin_0.png').convert()
-        self.mariusz_sprite = load_image('img/idle_0.png').convert()
-        self.x_mark = load_image('img/x_mark.png')
+        self.loading_screen_coin = assets.image('img/blue/mini_coin_0.png', False)
+        self.mariusz_sprite = assets.image('img/idle_0.png', False)
+        self.x_mark = assets.image('img/x_mark.png')
 
-        # HUD surface for easier positioning
-        self.surface = Surface((224, 16), SRCALPHA)
         # surface used for loading screen
         # this one doesn't have to be transparent
         self.loading_screen_surface = Surface((71, 41))
 
     def draw(self) -> None:
         """"Draw HUD onto screen."""
-        self.screen.blit(self.surface, (16, 8))
+        self.screen.blit(self.surface, self.position)
+
+    def set_field(self, name: str, value, image: Surface,
+                  position: tuple) -> None:
+        """Redraw field of the HUD if its value has changed."""
+        if self.fields.get(name) == value:
+            return
+        old_rect = self.field_rects.get(name)
+        if old_rect is not None:
+            self.surface.fill(TRANSPARENT, old_rect)
+        rect = self.surface.blit(image, position)
+
+        self.fields[name] = value
+        self.field_rects[name] = rect
+        if old_rect is not None:
+            rect = rect.union(old_rect)
+        self.dirty_rects.append(rect.move(self.position))
+
+    def clear_field(self, name: str) -> None:
+        """Remove field from the HUD."""
+        rect = self.field_rects.pop(name, None)
+        self.fields.pop(name, None)
+        if rect is not None:
+            self.surface.fill(TRANSPARENT, rect)
+            self.dirty_rects.append(rect.move(self.position))
+
+    def pop_dirty_rects(self) -> list:
+        """Return areas changed since the last call (screen coordinates)."""
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return dirty_rects
 
     def half_reset(self) -> None:
-        """Reset timer and coin indicator things."""
+        """Reset timer."""
         self.timer = 400
 
-        self.coin_frame = 0
-        self.coin_timer = time()
-
     def update_world(self, world: int) -> None:
         """
         Update Surface with world and map number. This method should be called
@@ -76,28 +114,21 @@ class Hud:
             second_number = world % 4
 
         # update Surface with world and map number
-        self.world = self.font.render(
-            f'{ceil(world / 4)}-{second_number}', False, WHITE
-        )
+        self.world_text = f'{ceil(world / 4)}-{second_number}'
+        self.world = self.text.render(self.world_text)
 
     def update_coin_indicator(self) -> None:
         """
         Update coin indicator animation - it's a standalone method because it
         should also be updated after death.
         """
-        if time() - self.coin_timer >= self.coin_animation[self.coin_frame][1]:
-            self.coin_timer = time()
-            self.coin_frame += 1
-            if self.coin_frame >= 4:
-                self.coin_frame = 0
-
-        coin_surface = self.coin_surfs[self.coin_animation[self.coin_frame][0]]
-        self.surface.blit(coin_surface, (72, 8))
+        index = self.coin_animation.frame
+        self.set_field('indicator', index, self.coin_surfs[index], (72, 8))
 
     def draw_loading_screen_exclusive(self, lifes: int) -> None:
         """Draw different coin indicator and lifes."""
         # indicator
-        self.surface.blit(self.loading_screen_coin, (72, 8))
+        self.set_field('indicator', 'loading', self.loading_screen_coin, (72, 8))
 
         # clear loading_screen-exclusive surface
         self.loading_screen_surface.fill(BLACK)
@@ -110,7 +141,7 @@ class Hud:
         # mariusz
         self.surface.blit(self.mariusz_sprite, (80, 89))
         self.loading_screen_surface.blit(self.x_mark, (33, 34))
-        surf = self.font.render(str(lifes), False, WHITE)
+        surf = self.text.render(str(lifes))
         self.loading_screen_surface.blit(surf, (56, 32))
 
         # draw surface onto screen
@@ -119,10 +150,10 @@ class Hud:
     def draw_game_over_screen_exclusive(self) -> None:
         """Draw different coin indicator and game over text."""
         # indicator
-        self.surface.blit(self.loading_screen_coin, (72, 8))
+        self.set_field('indicator', 'loading', self.loading_screen_coin, (72, 8))
 
         # game over text
-        surf = self.font.render('GAME OVER', False, WHITE)
+        surf = self.text.render('GAME OVER')
         self.screen.blit(surf, (88, 120))
 
     def subtract_time(self) -> int:
@@ -138,33 +169,33 @@ class Hud:
     def update_timer(self, update_time: bool=True) -> None:
         """Update timer and draw it onto HUD surface."""
         if update_time:
-            if time() - self.last_time >= 0.4:
+            if game_clock.now() - self.last_time >= 0.4:
                 self.timer = max(self.timer - 1, 0)
-                self.last_time = time()
+                self.last_time = game_clock.now()
 
         # display time
-        surf = self.font.render(str(self.timer).zfill(3), False, WHITE)
-        self.surface.blit(surf, (192, 8))
+        if self.fields.get('timer') != self.timer:
+            self.set_field('timer', self.timer,
+                           self.text.render(str(self.timer).zfill(3)), (192, 8))
+
+    def hide_timer(self) -> None:
+        """Remove timer from HUD - it's visible only during gameplay."""
+        self.clear_field('timer')
 
     def update(self, coins: int, points: int) -> None:
         """
         Update HUD content - world, coins and points. Coin indicator and timer
-        are updated separately.
+        are updated separately. Only changed values are redrawn.
         """
-        # clear hud
-        self.surface.fill(TRANSPARENT)
-
-        # display labels
-        for label, pos in self.labels:
-            self.surface.blit(label, pos)
-
         # display coins amount
-        surf = self.font.render(f'x{str(coins).zfill(2)}', False, WHITE)
-        self.surface.blit(surf, (80, 8))
+        if self.fields.get('coins') != coins:
+            self.set_field('coins', coins,
+                           self.text.render(f'x{str(coins).zfill(2)}'), (80, 8))
 
         # display points
-        surf = self.font.render(str(points).zfill(6), False, WHITE)
-        self.surface.blit(surf, (8, 8))
+        if self.fields.get('points') != points:
+            self.set_field('points', points,
+                           self.text.render(str(points).zfill(6)), (8, 8))
 
         # display world
-        self.surface.blit(self.world, (136 , 8))
+        self.set_field('world', self.world_text, self.world, (136, 8))
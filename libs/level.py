@@ -1,191 +1,327 @@
+from hashlib import md5
+from time import perf_counter
 from types import FunctionType
 
-from numpy import loadtxt, uint8
-from pygame.image import load as load_image
+from numpy import (argsort, array, int32, isin, loadtxt, ndarray, nonzero,
+                   split, uint8, unique)
 from pygame.sprite import Group
 from pygame.surface import Surface
 
+from .assets import assets
+from .bodies import KinematicGroup
+from .broadphase import DynamicGroup
+from .camera import Camera
 from .coin import Coin
+from .constants import ACTIVATION_DISTANCE, GOOMBA, KOOPA, TILE_SIZE
 from .enemies import Goomba, Koopa
+from .level_file import (CompiledLevel, compiled_path, read_metadata,
+                         write_compiled)
+from .static_layer import StaticLayer
+from .tile_group import TileGroup
 from .tiles import (Brick, CoinBrick, Decoration, HiddenBlock, QuestionBlock,
                     Tile)
 
+PLAYER_CELL = 20
+PLAYER_OFFSET = (-8, 8)
+# enemy cells: cell id -> (x offset, y offset, enemy type)
+SPAWN_CELLS = {
+    21: (0, 8, GOOMBA),
+    22: (-8, 8, GOOMBA),  # goomba (little bit to the left)
+    23: (0, 8, KOOPA)
+}
+# compiled spawns and player position depend on these too, so they are
+# hashed together with level's source
+COMPILER_KEY = repr((TILE_SIZE, PLAYER_CELL, PLAYER_OFFSET, SPAWN_CELLS))
+
 
 class Level:
     """Object with map data that contains all tiles."""
 
-    def __init__(self, screen: Surface, world: str, theme: str) -> None:
+    def __init__(self, screen: Surface, world: str, theme: str,
+                 bg_color: tuple, fixed_point: bool=False) -> None:
         self.screen = screen
 
-        self.tiles = Group()
-        self.coins = Group()
-        self.enemies = Group()
+        self.tiles = TileGroup()
+        self.coins = DynamicGroup()
+        self.enemies = KinematicGroup(self_collide=True,
+                                      fixed_point=fixed_point)
+        # enemies which weren't spawned yet, sorted by x: (x, y, type)
+        self.spawns = []
+        self.next_spawn = 0  # index of the first enemy waiting for spawn
+        self.enemy_kill_animation = None
         self.decorations = Group()
+        self.load_times = {}  # duration of loading phases in seconds
+        self.compiled = None  # memory-mapped compiled level
+        # level's metadata
+        self.portal = None  # (x, y, direction) of pipe leading to other map
+        self.checkpoint = None  # where player respawns after reaching it
+        self.entrances = {}  # previous map -> where player comes out
+        self.flagpole = None  # x of the flagpole
+        self.castle = None  # x where player enters castle after flagpole
+        self.ground = None  # bottom of player sliding down the flagpole
+        self.scrolling = True  # if screen follows player
 
         # temporary, these will be in Controller in the future
-        self.rock_img = load_image(f'img/{theme}/rock_0.png').convert()
-        self.block_img = load_image(f'img/{theme}/block_0.png').convert()
-        self.brick_img_0 = load_image(f'img/{theme}/brick_0.png').convert()
-        self.brick_img_1 = load_image(f'img/{theme}/brick_1.png').convert()
-        self.plate_img = load_image(f'img/{theme}/plate_0.png').convert()
-        self.hill_img_0 = load_image('img/hill_0.png').convert_alpha()
-        self.hill_img_1 = load_image('img/hill_1.png').convert_alpha()
-        self.bush_img_0 = load_image('img/bush_0.png').convert_alpha()
-        self.bush_img_1 = load_image('img/bush_1.png').convert_alpha()
-        self.bush_img_2 = load_image('img/bush_2.png').convert_alpha()
-        self.cloud_img_0 = load_image('img/cloud_0.png').convert_alpha()
-        self.cloud_img_1 = load_image('img/cloud_1.png').convert_alpha()
-        self.cloud_img_2 = load_image('img/cloud_2.png').convert_alpha()
-        self.pipe_img_0 = load_image('img/pipe_0.png').convert_alpha()
-        self.pipe_img_1 = load_image('img/pipe_1.png').convert_alpha()
-        self.pipe_img_2 = load_image('img/pipe_2.png').convert_alpha()
-        self.pipe_img_3 = load_image('img/pipe_3.png').convert_alpha()
-        self.pole_image = load_image('img/pole_0.png').convert_alpha()
-        self.castle_image = load_image('img/castle_0.png').convert_alpha()
+        self.rock_img = assets.image(f'img/{theme}/rock_0.png', False)
+        self.block_img = assets.image(f'img/{theme}/block_0.png', False)
+        self.brick_img_0 = assets.image(f'img/{theme}/brick_0.png', False)
+        self.brick_img_1 = assets.image(f'img/{theme}/brick_1.png', False)
+        self.plate_img = assets.image(f'img/{theme}/plate_0.png', False)
+        self.hill_img_0 = assets.image('img/hill_0.png')
+        self.hill_img_1 = assets.image('img/hill_1.png')
+        self.bush_img_0 = assets.image('img/bush_0.png')
+        self.bush_img_1 = assets.image('img/bush_1.png')
+        self.bush_img_2 = assets.image('img/bush_2.png')
+        self.cloud_img_0 = assets.image('img/cloud_0.png')
+        self.cloud_img_1 = assets.image('img/cloud_1.png')
+        self.cloud_img_2 = assets.image('img/cloud_2.png')
+        self.pipe_img_0 = assets.image('img/pipe_0.png')
+        self.pipe_img_1 = assets.image('img/pipe_1.png')
+        self.pipe_img_2 = assets.image('img/pipe_2.png')
+        self.pipe_img_3 = assets.image('img/pipe_3.png')
+        self.pole_image = assets.image('img/pole_0.png')
+        self.castle_image = assets.image('img/castle_0.png')
 
         # TODO: temporary?
         self.world = world
 
+        # pre-rendered background color, decorations and static tiles
+        self.static_layer = StaticLayer(bg_color)
+        self.tiles.listeners.append(self.static_layer.invalidate)
+
+    def palette(self, create_spinning_coin: FunctionType,
+                add_coin: FunctionType, create_debris: FunctionType,
+                add_powerup: FunctionType) -> dict:
+        """
+        Return table of map cells: cell id -> (group, offset from cell's
+        position, function creating object at given position).
+        """
+        tiles, coins, decorations = self.tiles, self.coins, self.decorations
+
+        def tile(image: Surface) -> FunctionType:
+            return lambda position: Tile(image, position)
+
+        def decoration(image: Surface) -> FunctionType:
+            return lambda position: Decoration(position, image)
+
+        return {
+            1: (tiles, (0, 8), tile(self.rock_img)),  # rock
+            2: (tiles, (0, 8), tile(self.block_img)),  # block
+            3: (tiles, (0, 8), lambda position: Brick(  # brick_0
+                self.brick_img_0, position, create_debris)),
+            4: (tiles, (0, 8), lambda position: Brick(  # brick_1
+                self.brick_img_0, position, create_debris)),
+            5: (tiles, (0, 8), tile(self.plate_img)),  # plate
+            6: (tiles, (0, 8), lambda position: CoinBrick(  # brick (coins)
+                self.brick_img_0, position, self.plate_img,
+                create_spinning_coin, add_coin)),
+            7: (tiles, (0, 8), lambda position: HiddenBlock(  # hidden 1up
+                position, self.plate_img, add_powerup)),
+            10: (tiles, (0, 8), lambda position: QuestionBlock(  # coin
+                position, create_spinning_coin, add_coin, add_powerup,
+                'red')),
+            11: (tiles, (0, 8), lambda position: QuestionBlock(  # power-up
+                position, create_spinning_coin, add_coin, add_powerup,
+                'red', True)),
+            12: (coins, (2, 8), lambda position: Coin(position, 'red')),
+            13: (tiles, (0, 8), tile(self.pipe_img_0)),  # pipe (top)
+            14: (tiles, (0, 8), tile(self.pipe_img_0)),  # pipe (entrance)
+            15: (tiles, (0, 8), tile(self.pipe_img_1)),  # pipe (middle)
+            16: (tiles, (-4, 8), tile(self.pipe_img_2)),  # pipe (crossing)
+            17: (tiles, (0, 8), tile(self.pipe_img_3)),  # pipe (left)
+            30: (decorations, (0, 21), decoration(self.hill_img_0)),
+            31: (decorations, (0, 21), decoration(self.hill_img_1)),
+            32: (decorations, (-8, 8), decoration(self.bush_img_0)),
+            33: (decorations, (-8, 8), decoration(self.bush_img_1)),
+            34: (decorations, (-8, 8), decoration(self.bush_img_2)),
+            35: (decorations, (8, 8), decoration(self.cloud_img_0)),
+            36: (decorations, (8, 8), decoration(self.cloud_img_1)),
+            37: (decorations, (8, 8), decoration(self.cloud_img_2)),
+            38: (decorations, (8, 0), decoration(self.pole_image)),
+            39: (decorations, (0, 8), decoration(self.castle_image))
+        }
+
     def load_level(self, create_spinning_coin: FunctionType,
                    add_coin: FunctionType, create_debris: FunctionType,
                    add_powerup: FunctionType,
                    enemy_kill_animation: FunctionType) -> tuple:
-        """Load level from file. Returns player position."""
-    
-        world_data = loadtxt(f"maps/world_{self.world}.csv",
-                             dtype=uint8, delimiter=',')
-    
-        for y, row in enumerate(world_data):
-            for x, cell in enumerate(row):
-                match cell:
-                    case 0:
-                        continue
-                    case 1:  # rock
-                        self.tiles.add(
-                            Tile(self.rock_img, (x * 16, y * 16 + 8))
-                        )
-                    case 2:  # block
-                        self.tiles.add(
-                            Tile(self.block_img, (x * 16, y * 16 + 8))
-                        )
-                    case 3:  # brick_0
-                        self.tiles.add(
-                            Brick(self.brick_img_0, (x * 16, y * 16 + 8),
-                                  create_debris)
-                        )
-                    case 4:  # brick_1
-                        self.tiles.add(
-                            Brick(self.brick_img_0, (x * 16, y * 16 + 8),
-                                  create_debris)
-                        )
-                    case 5:  # plate
-                        self.tiles.add(
-                            Tile(self.plate_img, (x * 16, y * 16 + 8))
-                        )
-                    case 6:  # brick (with coins)
-                        self.tiles.add(
-                            CoinBrick(self.brick_img_0, (x * 16, y * 16 + 8),
-                                      self.plate_img, create_spinning_coin,
-                                      add_coin)
-                        )
-                    case 7:  # hidden block (1up)
-                        self.tiles.add(
-                            HiddenBlock(( x * 16, y * 16 + 8), self.plate_img, add_powerup)
-                        )
-                    case 10:  # question block (coin)
-                        self.tiles.add(
-                            QuestionBlock((x * 16, y * 16 + 8), create_spinning_coin,
-                                        add_coin, add_powerup, 'red')
-                        )
-                    case 11:  # question block (power-up)
-                        self.tiles.add(
-                            QuestionBlock((x * 16, y * 16 + 8), create_spinning_coin,
-                                        add_coin, add_powerup, 'red', True)
-                        )
-                    case 12:  # coin
-                        self.coins.add(
-                            Coin((x * 16 + 2, y * 16 + 8), 'red')
-                        )
-                    case 13:  # pipe (top)
-                        self.tiles.add(
-                            Tile(self.pipe_img_0, (x * 16, y * 16 + 8))
-                        )
-                    case 14:  # pipe (top entrance)
-                        self.tiles.add(
-                            Tile(self.pipe_img_0, (x * 16, y * 16 + 8))
-                        )
-                    case 15:  # pipe (middle)
-                        self.tiles.add(
-                            Tile(self.pipe_img_1, (x * 16, y * 16 + 8))
-                        )
-                    case 16:  # pipe (crossing middle)
-                        self.tiles.add(
-                            Tile(self.pipe_img_2, (x * 16 - 4, y * 16 + 8))
-                        )
-                    case 17:  # pipe (left)
-                        self.tiles.add(
-                            Tile(self.pipe_img_3, (x * 16, y * 16 + 8))
-                        )
-                    case 20:  # player
-                        player_pos = (x * 16 - 8, y * 16 + 8)
-                    case 21:  # goomba
-                        self.enemies.add(
-                            Goomba(x * 16, y * 16 + 8, 'red', enemy_kill_animation)
-                        )
-                    case 22:  # goomba (little bit to the left)
-                        self.enemies.add(
-                            Goomba(x * 16 - 8, y * 16 + 8, 'red', enemy_kill_animation)
-                        )
-                    case 23:  # koopa
-                        self.enemies.add(
-                            Koopa(x * 16, y * 16 + 8, enemy_kill_animation)
-                        )
-                    case 30:  # hill (small)
-                        self.decorations.add(
-                            Decoration((x * 16, y * 16 + 21), self.hill_img_0)
-                        )
-                    case 31:  # hill (large)
-                        self.decorations.add(
-                            Decoration((x * 16, y * 16 + 21), self.hill_img_1)
-                        )
-                    case 32:  # bush (small)
-                        self.decorations.add(
-                            Decoration((x * 16 - 8, y * 16 + 8), self.bush_img_0)
-                        )
-                    case 33:  # bush (medium)
-                        self.decorations.add(
-                            Decoration((x * 16 - 8, y * 16 + 8), self.bush_img_1)
-                        )
-                    case 34:  # bush (large)
-                        self.decorations.add(
-                            Decoration((x * 16 - 8, y * 16 + 8), self.bush_img_2)
-                        )
-                    case 35:  # cloud (small)
-                        self.decorations.add(
-                            Decoration((x * 16 + 8, y * 16 + 8), self.cloud_img_0)
-                        )
-                    case 36:  # cloud (medium)
-                        self.decorations.add(
-                            Decoration((x * 16 + 8, y * 16 + 8), self.cloud_img_1)
-                        )
-                    case 37:  # cloud (large)
-                        self.decorations.add(
-                            Decoration((x * 16 + 8, y * 16 + 8), self.cloud_img_2)
-                        )
-                    case 38:  # pole
-                        self.decorations.add(
-                            Decoration((x * 16 + 8, y * 16), self.pole_image)
-                        )
-                    case 39:  # castle
-                        self.decorations.add(
-                            Decoration((x * 16, y * 16 + 8), self.castle_image)
-                        )
-        return player_pos
-
-    def draw(self, scroll: int) -> None:
-        """Draw all tiles onto screen."""
-        for decoration in self.decorations:
-            decoration.draw(self.screen, scroll)
-
-        for tile in self.tiles:
-            tile.draw(self.screen, scroll)
+        """
+        Load level from compiled file (it's compiled again if its source or
+        its tiles have changed). Returns player position. All cells of the
+        same type are found and created at once, so only non-empty cells
+        cost anything in Python.
+        """
+        self.enemy_kill_animation = enemy_kill_animation
+        palette = self.palette(create_spinning_coin, add_coin, create_debris,
+                               add_powerup)
+
+        start = perf_counter()
+        if CompiledLevel.is_current(self.world, COMPILER_KEY):
+            self.compiled = CompiledLevel(self.world)
+            world_data = self.compiled['grid']
+        else:
+            self.compiled = None
+            world_data = loadtxt(f"maps/world_{self.world}.csv",
+                                 dtype=uint8, delimiter=',')
+        read = perf_counter()
+
+        # non-empty cells in map order (row by row), grouped by cell id
+        rows, columns = nonzero(world_data)
+        cells = world_data[rows, columns]
+        xs = columns.astype(int32) * TILE_SIZE
+        ys = rows.astype(int32) * TILE_SIZE
+        order = argsort(cells, kind='stable')
+        cell_ids, starts = unique(cells[order], return_index=True)
+        indexed = perf_counter()
+
+        objects = [None] * len(cells)  # (group, object) in map order
+        for cell, indices in zip(cell_ids.tolist(), split(order, starts[1:])):
+            if cell in palette:
+                group, (dx, dy), create = palette[cell]
+                for index, x, y in zip(indices.tolist(),
+                                       (xs[indices] + dx).tolist(),
+                                       (ys[indices] + dy).tolist()):
+                    objects[index] = (group, create((x, y)))
+
+        # objects are added in map order, as they were before
+        for group in (self.tiles, self.coins, self.decorations):
+            group.add(*[sprite for owner, sprite in filter(None, objects)
+                        if owner is group])
+        built = perf_counter()
+
+        # solid area depends on offsets and images of tiles, not only on map
+        signature = self.tiles_signature()
+        if self.compiled is None or self.compiled.index['tiles'] != signature:
+            self.compile(world_data, signature)
+        index = self.compiled.index
+        self.tiles.set_solidity(self.compiled['solidity'],
+                                *index['solidity_origin'],
+                                index['solidity_cell'])
+        self.spawns = [tuple(spawn)
+                       for spawn in self.compiled['spawns'].tolist()]
+        self.next_spawn = 0
+
+        metadata = index['metadata']
+        self.portal = metadata.get('portal')
+        self.checkpoint = metadata.get('checkpoint')
+        self.entrances = metadata.get('entrances', {})
+        self.flagpole = metadata.get('flagpole')
+        self.castle = metadata.get('castle')
+        self.ground = metadata.get('ground')
+        self.scrolling = metadata.get('scroll', True)
+
+        self.static_layer.build(self.decorations, self.tiles)
+        end = perf_counter()
+
+        self.load_times = {
+            'read': read - start,
+            'index': indexed - read,
+            'build': built - indexed,
+            'static': end - built,  # includes compiling, if it was needed
+            'total': end - start
+        }
+
+        return self.start_position()
+
+    def start_position(self) -> tuple:
+        """Return player position at the start of level."""
+        return tuple(self.compiled.index['player'])
+
+    def tiles_signature(self) -> str:
+        """Return hash of rects of all tiles."""
+        rects = array([tuple(tile.rect) for tile in self.tiles], int32)
+        return md5(rects.tobytes()).hexdigest()
+
+    def compile(self, world_data: ndarray, signature: str) -> None:
+        """
+        Save compiled level: map grid, solid area of loaded tiles (with their
+        signature), spawns and player position found in the map, and level's
+        metadata.
+        """
+        rows, columns = nonzero(world_data == PLAYER_CELL)
+        player_pos = (int(columns[0]) * TILE_SIZE + PLAYER_OFFSET[0],
+                      int(rows[0]) * TILE_SIZE + PLAYER_OFFSET[1])
+
+        # enemies in the same column keep order from the map
+        spawns = []
+        rows, columns = nonzero(isin(world_data, list(SPAWN_CELLS)))
+        for index, (row, column) in enumerate(zip(rows.tolist(),
+                                                  columns.tolist())):
+            dx, dy, enemy_type = SPAWN_CELLS[int(world_data[row, column])]
+            spawns.append((column * TILE_SIZE + dx, index,
+                           row * TILE_SIZE + dy, enemy_type))
+        spawns.sort()
+        spawns = array([(x, y, enemy_type) for x, _, y, enemy_type in spawns],
+                       int32).reshape(-1, 3)
+
+        bitmap, left, top, cell = self.tiles.solidity()
+        arrays = {'grid': world_data, 'solidity': bitmap, 'spawns': spawns}
+        write_compiled(self.world, arrays, COMPILER_KEY, tiles=signature,
+                       solidity_origin=(left, top), solidity_cell=cell,
+                       player=player_pos, metadata=read_metadata(self.world))
+        self.compiled = CompiledLevel(self.world)
+
+    def snapshot(self) -> dict:
+        """Return copy of level's mutable state (e.g. right after loading)."""
+        return {
+            'tiles': [(tile, tile.snapshot()) for tile in self.tiles],
+            'order': dict(self.tiles.order),
+            'coins': self.coins.sprites()
+        }
+
+    def restore(self, snapshot: dict) -> tuple:
+        """
+        Bring level back to state from snapshot, without loading it again.
+        Returns player position.
+        """
+        self.tiles.restore(snapshot['order'])  # destroyed tiles
+        for tile, state in snapshot['tiles']:
+            tile.restore(state)
+        for tile in list(self.tiles.active):
+            tile.deactivate()
+        # all tiles are in their places again
+        index = self.compiled.index
+        self.tiles.set_solidity(self.compiled['solidity'],
+                                *index['solidity_origin'],
+                                index['solidity_cell'])
+
+        self.coins.add(*snapshot['coins'])
+
+        self.enemies.empty()
+        self.next_spawn = 0
+
+        self.static_layer.build(self.decorations, self.tiles)
+        return self.start_position()
+
+    def spawn_enemies(self, scroll: int) -> None:
+        """Create enemies which have just come within activation distance."""
+        while (self.next_spawn < len(self.spawns) and
+               self.spawns[self.next_spawn][0] - scroll <=
+               ACTIVATION_DISTANCE):
+            x, y, enemy_type = self.spawns[self.next_spawn]
+            self.next_spawn += 1
+            if enemy_type == KOOPA:
+                enemy = Koopa(x, y, self.enemy_kill_animation)
+            else:
+                enemy = Goomba(x, y, 'red', self.enemy_kill_animation)
+            self.enemies.add(enemy)
+
+    def draw(self, camera: Camera) -> None:
+        """Draw background, decorations and visible tiles onto screen."""
+        self.static_layer.draw(self.screen, camera)
+
+
+if __name__ == '__main__':
+    from glob import glob
+
+    import pygame
+
+    # tiles are created to find their solid area, which needs display (but
+    # not mixer, tiles load their sounds only when they are played)
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    for source in sorted(glob('maps/world_*.csv')):
+        world = source[len('maps/world_'):-len('.csv')]
+        level = Level(pygame.Surface((1, 1)), world, 'red', (0, 0, 0))
+        level.load_level(*[None] * 5)  # compiles level if it's out of date
+        print(f'{compiled_path(world)} is up to date')
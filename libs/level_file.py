@@ -0,0 +1,114 @@
+# Compiled level. Map grid and everything which can be computed from it
+# without creating objects are stored in a single file next to the map:
+#     MAGIC | index size (uint32) | index (JSON) | arrays
+# Index contains hash of the sources (map, its JSON metadata and compiler's
+# key - cell definitions from code), signature of tiles the solid area was
+# computed from, metadata, player position, origin and cell size of solid
+# area and offsets of arrays: grid of cells, bitmap of solid cells and spawns
+# sorted by x. Arrays are used directly from the memory-mapped file. Levels
+# are compiled when their source changes, run `python -m libs.level` to
+# compile all of them in advance.
+
+from hashlib import md5
+from json import dumps, loads
+from mmap import ACCESS_READ, mmap
+from os import path, replace
+from struct import Struct
+
+from numpy import dtype, frombuffer, ndarray
+
+MAGIC = b'SMBLVL2\0'
+HEADER = Struct('<8sI')
+ALIGNMENT = 16  # arrays start at multiples of this
+
+
+def source_paths(world: str) -> tuple:
+    """Return paths of level's map and its metadata."""
+    return f'maps/world_{world}.csv', f'maps/world_{world}.json'
+
+
+def compiled_path(world: str) -> str:
+    """Return path of compiled level."""
+    return f'maps/world_{world}.lvl'
+
+
+def source_hash(world: str, key: str='') -> str:
+    """Return hash of level's source files and compiler's key."""
+    digest = md5(MAGIC + key.encode())
+    for source in source_paths(world):
+        if path.exists(source):
+            with open(source, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def read_metadata(world: str) -> dict:
+    """Return level's metadata (empty if level doesn't have any)."""
+    metadata = source_paths(world)[1]
+    if not path.exists(metadata):
+        return {}
+    with open(metadata) as f:
+        return loads(f.read())
+
+
+def write_compiled(world: str, arrays: dict, key: str='', **index) -> None:
+    """Save compiled level with given arrays and additional index data."""
+    offsets = {}
+    offset = 0
+    for name, array in arrays.items():
+        offsets[name] = (offset, array.dtype.str, array.shape)
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    index = dumps({'hash': source_hash(world, key), 'arrays': offsets,
+                   **index}).encode()
+    # data starts aligned too
+    index += b' ' * (-(HEADER.size + len(index)) % ALIGNMENT)
+
+    # file is replaced at once, because it can be mapped by loaded level
+    output = compiled_path(world)
+    with open(output + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        for name, array in arrays.items():
+            f.seek(HEADER.size + len(index) + offsets[name][0])
+            f.write(array.tobytes())
+        f.truncate(HEADER.size + len(index) + offset)  # with last padding
+    replace(output + '.tmp', output)
+
+
+class CompiledLevel:
+    """Memory-mapped compiled level, its arrays are views of the file."""
+
+    def __init__(self, world: str) -> None:
+        """Open compiled level and read its index."""
+        file = compiled_path(world)
+        with open(file, 'rb') as f:
+            self.data = mmap(f.fileno(), 0, access=ACCESS_READ)
+
+        magic, index_size = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f'{file} is not a compiled level')
+        self.index = loads(self.data[HEADER.size:HEADER.size + index_size])
+        self.data_offset = HEADER.size + index_size
+
+    @staticmethod
+    def is_current(world: str, key: str='') -> bool:
+        """Check if compiled level exists and was made from current source."""
+        file = compiled_path(world)
+        if not path.exists(file):
+            return False
+        with open(file, 'rb') as f:
+            magic, index_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                return False
+            index = loads(f.read(index_size))
+        return index['hash'] == source_hash(world, key)
+
+    def __getitem__(self, name: str) -> ndarray:
+        """Return array as a view of the file."""
+        offset, dtype_str, shape = self.index['arrays'][name]
+        count = 1
+        for size in shape:
+            count *= size
+        return frombuffer(self.data, dtype(dtype_str), count,
+                          self.data_offset + offset).reshape(shape)
@@ -0,0 +1,146 @@
+from math import inf
+
+from numpy import append, count_nonzero, int32, minimum, nonzero, zeros
+from pygame.surface import Surface
+
+from .camera import Camera
+from .clock import game_clock
+from .constants import DISPLAY_SIZE, MAX_FALL_SPEED
+
+
+class ParticleSystem:
+    """
+    Structure-of-arrays particle engine used for short-lived effects: brick
+    debris, floating points, spinning coins and dead enemies. State of all
+    particles is kept in NumPy arrays, so they're moved in one vectorized step
+    and drawn with a single blits() call, no matter how many there are.
+    """
+
+    def __init__(self, capacity: int=64) -> None:
+        """Initialize ParticleSystem."""
+        self.count = 0  # number of living particles (first rows of arrays)
+        self.pos = zeros((capacity, 2))
+        self.speed = zeros((capacity, 2))
+        self.gravity = zeros(capacity)
+        self.born = zeros(capacity)  # game clock time of emission
+        self.lifetime = zeros(capacity)  # inf - until it falls off screen
+        self.sprite = zeros(capacity, int32)
+
+        # particle sprites: frames and function called with (x, y) on expiry
+        self.sprites = []
+        self.sprite_ids = {}  # key -> index in sprites
+        self.frame_times = zeros(0)
+        self.widths = zeros(0, int32)
+        self.heights = zeros(0, int32)
+
+    def arrays(self) -> tuple:
+        """Return all per-particle arrays."""
+        return (self.pos, self.speed, self.gravity, self.born, self.lifetime,
+                self.sprite)
+
+    def register(self, key, frames: tuple, frame_time: float=inf,
+                 on_expire=None) -> int:
+        """Return id of particle sprite, register it if it doesn't exist."""
+        sprite_id = self.sprite_ids.get(key)
+        if sprite_id is not None:
+            return sprite_id
+
+        sprite_id = self.sprite_ids[key] = len(self.sprites)
+        self.sprites.append((frames, on_expire))
+        width, height = frames[0].get_size()
+        self.frame_times = append(self.frame_times, frame_time)
+        self.widths = append(self.widths, int32(width))
+        self.heights = append(self.heights, int32(height))
+        return sprite_id
+
+    def grow(self) -> None:
+        """Double capacity of arrays."""
+        capacity = len(self.sprite) * 2
+        arrays = [self.resized(array, capacity) for array in self.arrays()]
+        (self.pos, self.speed, self.gravity, self.born, self.lifetime,
+         self.sprite) = arrays
+
+    def resized(self, array, capacity: int):
+        """Return copy of array with new capacity and living particles."""
+        new = zeros((capacity,) + array.shape[1:], array.dtype)
+        new[:self.count] = array[:self.count]
+        return new
+
+    def emit(self, sprite_id: int, position: tuple, speed: tuple=(0, 0),
+             gravity: float=0.0, lifetime: float=inf) -> None:
+        """Create new particle (position is top left corner of the sprite)."""
+        if self.count == len(self.sprite):
+            self.grow()
+        i = self.count
+        self.pos[i] = position
+        self.speed[i] = speed
+        self.gravity[i] = gravity
+        self.born[i] = game_clock.now()
+        self.lifetime[i] = lifetime
+        self.sprite[i] = sprite_id
+        self.count += 1
+
+    def clear(self) -> None:
+        """Remove all particles."""
+        self.count = 0
+
+    def update(self, dt: float) -> None:
+        """Move all particles and remove expired or fallen ones."""
+        count = self.count
+        if not count:
+            return
+
+        pos = self.pos[:count]
+        speed = self.speed[:count]
+        speed[:, 1] = minimum(speed[:, 1] + self.gravity[:count] * dt,
+                              MAX_FALL_SPEED)
+        pos += speed * dt
+
+        expired = game_clock.now() - self.born[:count] >= self.lifetime[:count]
+        dead = expired | (pos[:, 1] > DISPLAY_SIZE[1])
+        if not dead.any():
+            return
+
+        # callbacks are called after removing, because they can emit particles
+        callbacks = []
+        for i in nonzero(expired)[0]:
+            on_expire = self.sprites[self.sprite[i]][1]
+            if on_expire is not None:
+                callbacks.append((on_expire, int(pos[i, 0]), int(pos[i, 1])))
+
+        keep = ~dead
+        self.count = int(count_nonzero(keep))
+        for array in self.arrays():
+            array[:self.count] = array[:count][keep]
+
+        for on_expire, x, y in callbacks:
+            on_expire(x, y)
+
+    def draw(self, screen: Surface, camera: Camera) -> None:
+        """Draw visible particles onto screen."""
+        count = self.count
+        if not count:
+            return
+
+        sprite = self.sprite[:count]
+        x = self.pos[:count, 0].astype(int32) - camera.scroll
+        y = self.pos[:count, 1].astype(int32)
+        visible = ((x + self.widths[sprite] > -camera.margin) &
+                   (x < camera.width + camera.margin) &
+                   (y + self.heights[sprite] > -camera.margin) &
+                   (y < camera.height + camera.margin))
+
+        # animation frame is taken from age of particle
+        age = game_clock.now() - self.born[:count][visible]
+        frames = (age // self.frame_times[sprite[visible]]).astype(int32)
+
+        sprites = self.sprites
+        screen.blits([
+            (sprites[s][0][f % len(sprites[s][0])], (px, py))
+            for s, f, px, py in zip(sprite[visible].tolist(), frames.tolist(),
+                                    x[visible].tolist(), y[visible].tolist())
+        ], False)
+
+        drawn = int(count_nonzero(visible))
+        camera.drawn += drawn
+        camera.culled += count - drawn
@@ -1,17 +1,23 @@
-from time import time
+from struct import Struct
 from types import FunctionType
 
 from pygame.constants import K_DOWN, K_LEFT, K_RIGHT, K_a
-from pygame.image import load as load_image
 from pygame.key import get_pressed
 from pygame.math import Vector2
-from pygame.mixer import Sound, music, Channel
-from pygame.sprite import Group, Sprite, spritecollide
+from pygame.mixer import music, Channel
+from pygame.sprite import Group, Sprite
 from pygame.surface import Surface
-from pygame.transform import flip
 
-from .constants import KOOPA, LOADING_STATE
+from .assets import assets
+from .bodies import substeps
+from .clock import game_clock
+from .constants import KOOPA, LOADING_STATE, MAX_FALL_SPEED
+from .fixed import FixedVector
 from .powerups import OneUP
+from .sprite_cache import clipped, faded, flipped
+
+# raw position and speed in fixed-point mode
+STATE = Struct('<4i')
 
 
 class Mariusz(Sprite):
@@ -19,7 +25,9 @@ class Mariusz(Sprite):
                  add_coin: FunctionType, add_points: FunctionType,
                  create_fireball: FunctionType, remove_life: FunctionType,
                  switch_game_state: FunctionType,
-                 add_life: FunctionType) -> None:
+                 add_life: FunctionType, flagpole: int | None=None,
+                 castle: int | None=None, ground: int | None=None,
+                 fixed_point: bool=False) -> None:
         super().__init__()
         self.screen = screen
 
@@ -29,46 +37,53 @@ class Mariusz(Sprite):
         self.frame_index = 0
         self.states = {
             0: {
-                'idle': load_image('img/idle_0.png').convert_alpha(),
-                'run': [load_image(f'img/run_{i}.png').convert_alpha()
+                'idle': assets.image('img/idle_0.png'),
+                'run': [assets.image(f'img/run_{i}.png')
                         for i in range(3)],
-                'jump': load_image('img/jump_0.png').convert_alpha(),
-                'die': load_image('img/die_0.png').convert_alpha(),
-                'brake': load_image('img/brake_0.png').convert_alpha(),
-                'slide': load_image('img/slide_0.png').convert_alpha(),
-                'upgrade': [load_image(f'img/upgrade_{i}.png').convert_alpha()
+                'jump': assets.image('img/jump_0.png'),
+                'die': assets.image('img/die_0.png'),
+                'brake': assets.image('img/brake_0.png'),
+                'slide': assets.image('img/slide_0.png'),
+                'upgrade': [assets.image(f'img/upgrade_{i}.png')
                             for i in range(3)],
                 'upgrade_2': [
-                    load_image('img/large_idle_0.png').convert_alpha(),
-                    load_image('img/between_idle_0.png').convert_alpha(),
-                    load_image('img/fire_idle_0.png').convert_alpha()
+                    assets.image('img/large_idle_0.png'),
+                    assets.image('img/between_idle_0.png'),
+                    assets.image('img/fire_idle_0.png')
                 ]
             },
             1: {
-                'idle': load_image('img/large_idle_0.png').convert_alpha(),
-                'run': [load_image(f'img/large_run_{i}.png').convert_alpha()
+                'idle': assets.image('img/large_idle_0.png'),
+                'run': [assets.image(f'img/large_run_{i}.png')
                         for i in range(3)],
-                'jump': load_image('img/large_jump_0.png').convert_alpha(),
-                'crouch': load_image('img/large_crouch_0.png').convert_alpha(),
-                'brake': load_image('img/large_brake_0.png').convert_alpha(),
-                'slide': load_image('img/large_slide_0.png').convert_alpha()
+                'jump': assets.image('img/large_jump_0.png'),
+                'crouch': assets.image('img/large_crouch_0.png'),
+                'brake': assets.image('img/large_brake_0.png'),
+                'slide': assets.image('img/large_slide_0.png')
             },
             2: {
-                'idle': load_image('img/fire_idle_0.png').convert_alpha(),
-                'run': [load_image(f'img/fire_run_{i}.png').convert_alpha()
+                'idle': assets.image('img/fire_idle_0.png'),
+                'run': [assets.image(f'img/fire_run_{i}.png')
                         for i in range(3)],
-                'jump': load_image('img/fire_jump_0.png').convert_alpha(),
-                'crouch': load_image('img/fire_crouch_0.png').convert_alpha(),
-                'brake': load_image('img/fire_brake_0.png').convert_alpha(),
-                'slide': load_image('img/fire_slide_0.png').convert_alpha()
+                'jump': assets.image('img/fire_jump_0.png'),
+                'crouch': assets.image('img/fire_crouch_0.png'),
+                'brake': assets.image('img/fire_brake_0.png'),
+                'slide': assets.image('img/fire_slide_0.png')
             }
         }
         self.image = self.states[self.size]['idle']
         self.flip = False
+        # images drawn half-transparent after downgrade, until invincible
+        self.fading_images = {
+            self.states[0]['idle'], self.states[0]['jump'],
+            self.states[0]['brake'], *self.states[0]['run']
+        }
 
         self.rect = self.image.get_rect(topleft=position)
-        self.pos = Vector2(position)
-        self.speed = Vector2(0, 0)
+        # in fixed-point mode every value is rounded to whole sub-pixels
+        vector = FixedVector if fixed_point else Vector2
+        self.pos = vector(position)
+        self.speed = vector(0, 0)
 
         self.add_coin = add_coin
         self.add_points = add_points
@@ -76,14 +91,19 @@ class Mariusz(Sprite):
         self.remove_life = remove_life
         self.switch_game_state = switch_game_state
         self.add_life = add_life
-
-        self.jump_sound = Sound('sfx/smb_jump-small.wav')
-        self.large_jump_sound = Sound('sfx/smb_jump-super.wav')
-        self.stomp_sound = Sound('sfx/smb_stomp.wav')
-        self.powerup_sound = Sound('sfx/smb_powerup.wav')
-        self.pipe_sound = Sound('sfx/smb_pipe.wav')
-        self.kick_sound = Sound('sfx/smb_kick.wav')
-        self.slide_sound = Sound('sfx/smb_flagpole.wav')
+        # function returning held keys (replaced by scripted input in checks)
+        self.held_keys = get_pressed
+        self.flagpole = flagpole  # x of flagpole (None if there isn't any)
+        self.castle = castle  # x where player disappears in castle
+        self.ground = ground  # bottom of player at the end of flagpole
+
+        self.jump_sound = assets.sound('sfx/smb_jump-small.wav')
+        self.large_jump_sound = assets.sound('sfx/smb_jump-super.wav')
+        self.stomp_sound = assets.sound('sfx/smb_stomp.wav')
+        self.powerup_sound = assets.sound('sfx/smb_powerup.wav')
+        self.pipe_sound = assets.sound('sfx/smb_pipe.wav')
+        self.kick_sound = assets.sound('sfx/smb_kick.wav')
+        self.slide_sound = assets.sound('sfx/smb_flagpole.wav')
 
         self.in_air = False
         self.crouching = False
@@ -120,6 +140,21 @@ class Mariusz(Sprite):
         self.channel = Channel(7)
         self.sit_time = 0
 
+    def pack_state(self) -> bytes:
+        """Return position and speed in sub-pixels (fixed-point mode)."""
+        if not isinstance(self.pos, FixedVector):
+            raise ValueError('state can be packed only in fixed-point mode')
+        return STATE.pack(self.pos.raw_x, self.pos.raw_y,
+                          self.speed.raw_x, self.speed.raw_y)
+
+    def unpack_state(self, data: bytes) -> None:
+        """Set position and speed from pack_state()."""
+        if not isinstance(self.pos, FixedVector):
+            raise ValueError('state can be unpacked only in fixed-point mode')
+        (self.pos.raw_x, self.pos.raw_y,
+         self.speed.raw_x, self.speed.raw_y) = STATE.unpack(data)
+        self.rect.topleft = (self.pos.x, self.pos.y)
+
     def change_state(self, new_state: str) -> None:
         if self.state == 'slide':
             return
@@ -136,10 +171,10 @@ class Mariusz(Sprite):
         if self.size < 2:
             return
 
-        if time() - self.last_shoot_time < 0.4:
+        if game_clock.now() - self.last_shoot_time < 0.4:
             return
 
-        self.last_shoot_time = time()
+        self.last_shoot_time = game_clock.now()
 
         if self.flip:
             self.create_fireball(self.rect.midleft, -1)
@@ -150,7 +185,7 @@ class Mariusz(Sprite):
         if not self.in_air:
             self.can_jump = True
             self.hold_jump = True
-            self.hold_jump_timer = time()
+            self.hold_jump_timer = game_clock.now()
 
     def upgrade(self) -> None:
         self.powerup_sound.play()
@@ -172,22 +207,15 @@ class Mariusz(Sprite):
 
         self.is_upgrading = True
         self.invincible = True
-        self.hit_time = time()
+        self.hit_time = game_clock.now()
 
     def remove_invincibility(self) -> None:
         if not self.invincible:
             return
 
-        if time() - self.hit_time >= 4:
+        if game_clock.now() - self.hit_time >= 4:
             self.invincible = False
 
-            # set full visibility to all states
-            self.states[0]['idle'].set_alpha(255)
-            self.states[0]['jump'].set_alpha(255)
-            self.states[0]['brake'].set_alpha(255)
-            for image in self.states[0]['run']:
-                image.set_alpha(255)
-
     def update_animation(self, dt: float) -> None:
         # this one is checked ONLY ONCE just after upgrade() or downgrade()
         # TODO: this might be somewhere else, kinda bad it's checked every frame
@@ -204,7 +232,7 @@ class Mariusz(Sprite):
             self.image = self.states[self.size][self.state]
 
     def move_horizontally(self, dt: float, scroll: int) -> None:
-        keys = get_pressed()
+        keys = self.held_keys()
 
         if keys[K_a]:
             max_speed = 4
@@ -267,7 +295,7 @@ class Mariusz(Sprite):
             self.rect.x = scroll
 
         # pole collision
-        if self.pos.x >= 3161:
+        if self.flagpole is not None and self.pos.x >= self.flagpole:
             if self.rect.y <= 96:
                 self.add_points(5000, True)
             elif self.rect.y <= 128:
@@ -284,8 +312,8 @@ class Mariusz(Sprite):
         music.stop()
         self.channel.play(self.slide_sound)
         self.flip = False
-        self.rect.x = 3161
-        self.pos.x = 3161
+        self.rect.x = self.flagpole
+        self.pos.x = self.flagpole
         self.speed.x = 0
         self.speed.y = 0
         self.change_state('slide')
@@ -306,10 +334,10 @@ class Mariusz(Sprite):
             self.pos.x += 2 * dt
             self.rect.x = self.pos.x
             self.update_animation(dt)
-            if self.rect.x >= 3264:
+            if self.rect.x >= self.castle:
                 self.dont_draw = True
         elif self.sitting:
-            if time() - self.sit_time >= 0.5:
+            if game_clock.now() - self.sit_time >= 0.5:
                 self.walking_to_castle = True
                 self.flip = False
                 self.state = 'run'
@@ -322,14 +350,14 @@ class Mariusz(Sprite):
             self.pos.y += 2 * dt
             self.rect.y = self.pos.y
 
-            if self.rect.bottom >= 184:
-                self.rect.bottom = 184
+            if self.rect.bottom >= self.ground:
+                self.rect.bottom = self.ground
                 if not self.channel.get_busy():
                     self.sitting = True
                     self.flip = True
                     self.rect.x += 14
                     self.pos.x += 14
-                    self.sit_time = time()
+                    self.sit_time = game_clock.now()
 
     def move_vertically(self, dt: float) -> None:
         # apply gravity
@@ -346,7 +374,7 @@ class Mariusz(Sprite):
             self.jumped = True
 
         if self.hold_jump and self.speed.y < 0:
-            if time() - self.hold_jump_timer <= 0.30:
+            if game_clock.now() - self.hold_jump_timer <= 0.30:
                 self.speed.y = -6
 
         self.pos.y += self.speed.y * dt
@@ -356,42 +384,40 @@ class Mariusz(Sprite):
             self.kill()
 
     def check_horizontal_collisions(self, tiles: Group) -> None:
-        for tile in tiles:
-            if self.rect.colliderect(tile.rect):
-                # touching right wall
-                if self.speed.x < 0:
-                    self.rect.left = tile.rect.right
-                    self.pos.x = self.rect.x
-                    self.speed.x = 0
-                    self.change_state('idle')
-                    return  # finish looking for collisions
-                # touching left wall
-                elif self.speed.x > 0:
-                    self.rect.right = tile.rect.left
-                    self.pos.x = self.rect.x
-                    self.speed.x = 0
-                    return  # finish looking for collisions
+        for tile in tiles.colliding(self.rect):
+            # touching right wall
+            if self.speed.x < 0:
+                self.rect.left = tile.rect.right
+                self.pos.x = self.rect.x
+                self.speed.x = 0
+                self.change_state('idle')
+                return  # finish looking for collisions
+            # touching left wall
+            elif self.speed.x > 0:
+                self.rect.right = tile.rect.left
+                self.pos.x = self.rect.x
+                self.speed.x = 0
+                return  # finish looking for collisions
 
     def check_vertical_collisions(self, tiles: Group) -> None:
-        for tile in tiles:
-            if self.rect.colliderect(tile.rect):
-                # touching floor
-                if self.speed.y > 0:
-                    self.rect.bottom = tile.rect.top
-                    self.pos.y = self.rect.y
-                    self.speed.y = 0
-                    self.in_air = False
-                    self.jumped = False
-                elif self.speed.y < 0:
-                    self.rect.top = tile.rect.bottom
-                    self.pos.y = self.rect.y
-                    self.speed.y = 0
-                    # TODO: destroying tile wouldn't kill enemy
-                    if self.size == 0:
-                        tile.bump()
-                    else:
-                        tile.destroy()
-                return  # finish looking for collisions
+        for tile in tiles.colliding(self.rect):
+            # touching floor
+            if self.speed.y > 0:
+                self.rect.bottom = tile.rect.top
+                self.pos.y = self.rect.y
+                self.speed.y = 0
+                self.in_air = False
+                self.jumped = False
+            elif self.speed.y < 0:
+                self.rect.top = tile.rect.bottom
+                self.pos.y = self.rect.y
+                self.speed.y = 0
+                # TODO: destroying tile wouldn't kill enemy
+                if self.size == 0:
+                    tile.bump()
+                else:
+                    tile.destroy()
+            return  # finish looking for collisions
         if abs(self.speed.y) > 1.5:
             self.in_air = True
             self.change_state('jump')
@@ -400,14 +426,14 @@ class Mariusz(Sprite):
                 self.change_state('jump')
 
     def check_coin_collision(self, coins: Group) -> None:
-        coin_collisions = spritecollide(self, coins, False)
+        coin_collisions = coins.collide(self)
 
         for coin in coin_collisions:
             coin.kill()
             self.add_coin()
 
     def check_enemy_collisions(self, enemies: Group) -> None:
-        enemy_collisions = spritecollide(self, enemies, False)
+        enemy_collisions = enemies.collide(self)
 
         if enemy_collisions:
             player_bottom = self.rect.bottom
@@ -463,7 +489,7 @@ class Mariusz(Sprite):
                         self.downgrade()
 
     def check_mushroom_collisions(self, mushrooms: Group) -> None:
-        mushroom_collisions = spritecollide(self, mushrooms, False)
+        mushroom_collisions = mushrooms.collide(self)
 
         if mushroom_collisions:
             for mushroom in mushroom_collisions:
@@ -475,7 +501,9 @@ class Mariusz(Sprite):
                     self.add_life()
                     self.add_points('1UP')
 
-    def check_portal_collision(self, portal: tuple):
+    def check_portal_collision(self, portal: tuple | None):
+        if portal is None:
+            return
         if self.rect.collidepoint(portal[0], portal[1]):
             if portal[2] == 'down':
                 if abs(self.rect.centerx - portal[0]) <= 4 and self.crouching:
@@ -484,7 +512,7 @@ class Mariusz(Sprite):
                     self.speed.x = 0
                     self.speed.y = 1
                     self.change_state('idle')
-                    self.pipe_time = time()
+                    self.pipe_time = game_clock.now()
                     self.before_pipe_pos = self.rect.y
             else:  # portal[2] == 'right'
                 if abs(self.rect.bottomright[1] - portal[1]) <= 1:
@@ -493,12 +521,12 @@ class Mariusz(Sprite):
                     self.speed.x = 1
                     self.speed.y = 0
                     self.change_state('run')
-                    self.pipe_time = time()
+                    self.pipe_time = game_clock.now()
                     self.before_pipe_pos = self.rect.x
                     self.flip = False
 
     def pipe_animation(self, dt: float) -> bool | None:
-        if time() - self.pipe_time >= 1:
+        if game_clock.now() - self.pipe_time >= 1:
             return True
         if self.speed.y > 0:  # down
             self.pos.y += self.speed.y * dt
@@ -510,8 +538,8 @@ class Mariusz(Sprite):
 
     def downgrade_animation(self) -> None:
         # I really don't want to but I have to, so there goes spaghetti
-        if time() - self.upgrade_timer >= 0.1:
-            self.upgrade_timer = time()
+        if game_clock.now() - self.upgrade_timer >= 0.1:
+            self.upgrade_timer = game_clock.now()
             self.upgrade_index -= 1
 
             if self.upgrade_index >= 0:
@@ -524,21 +552,15 @@ class Mariusz(Sprite):
                 self.rect.inflate_ip(0, -16)
                 self.rect.y += 8
                 self.pos.y += 8
-
-                # after animation set images to half-invisible
-                self.states[0]['idle'].set_alpha(128)
-                self.states[0]['jump'].set_alpha(128)
-                self.states[0]['brake'].set_alpha(128)
-                for image in self.states[0]['run']:
-                    image.set_alpha(128)
+                # after animation images are drawn half-invisible (see draw)
 
     def upgrade_animation(self) -> None:
         if self.invincible:
             self.downgrade_animation()
             return
 
-        if time() - self.upgrade_timer >= 0.1:
-            self.upgrade_timer = time()
+        if game_clock.now() - self.upgrade_timer >= 0.1:
+            self.upgrade_timer = game_clock.now()
             self.upgrade_index += 1
 
             if self.upgrade_index <= 9:
@@ -550,10 +572,10 @@ class Mariusz(Sprite):
                 self.is_upgrading = False
 
     def die_animation(self, dt: float) -> None:
-        if time() - self.die_timer >= 0.4 and self.rect.y <= 224: 
+        if game_clock.now() - self.die_timer >= 0.4 and self.rect.y <= 224: 
             self.move_vertically(dt)
 
-        if time() - self.die_timer >= 3.4:
+        if game_clock.now() - self.die_timer >= 3.4:
             self.switch_game_state(LOADING_STATE)
 
     def kill(self) -> None:
@@ -569,27 +591,31 @@ class Mariusz(Sprite):
         self.speed.x = 0
         self.speed.y = -10
         self.remove_life()
-        self.die_timer = time()
+        self.die_timer = game_clock.now()
 
-    def draw(self, scroll: int) -> bool | None:
+    def draw(self, scroll: int, position: tuple | None=None) -> bool | None:
+        """
+        Draw player onto screen. Position can be given to draw player
+        somewhere else than its rect (e.g. interpolated between ticks).
+        """
         if self.dont_draw:
             return
 
         if self.piping:
             if self.speed.y > 0:  # piping down
                 diff = self.rect.y - self.before_pipe_pos
-                image = self.image.subsurface(0, 0, 16, self.image.get_height() - diff)
+                image = clipped(self.image, 16, self.image.get_height() - diff)
             else:  # piping right
                 diff = self.rect.x - self.before_pipe_pos
-                image = self.image.subsurface(0, 0, 16 - diff, self.image.get_height())
+                image = clipped(self.image, 16 - diff, self.image.get_height())
             self.screen.blit(image, (self.rect.x - scroll, self.rect.y))
             return
 
-        if self.flip:
-            self.screen.blit(flip(self.image, True, False),
-                             (self.rect.x - scroll, self.rect.y))
-        else:
-            self.screen.blit(self.image, (self.rect.x - scroll, self.rect.y))
+        x, y = position or self.rect.topleft
+        image = self.image
+        if self.invincible and image in self.fading_images:
+            image = faded(image, 128)
+        self.screen.blit(flipped(image, self.flip), (x - scroll, y))
 
     def update(self, dt: float, coins: Group, tiles: Group,
                enemies: Group, mushrooms: Group, scroll: int,
@@ -607,11 +633,17 @@ class Mariusz(Sprite):
             self.shoot()
             self.can_shoot = False
 
-        self.move_horizontally(dt, scroll)
-        self.check_horizontal_collisions(tiles)
+        # long moves are split into a few steps, so player can't skip tiles
+        steps = int(substeps(MAX_FALL_SPEED * dt))
+        for _ in range(steps):
+            self.move_horizontally(dt / steps, scroll)
+            self.check_horizontal_collisions(tiles)
+
+            self.move_vertically(dt / steps)
+            self.check_vertical_collisions(tiles)
 
-        self.move_vertically(dt)
-        self.check_vertical_collisions(tiles)
+            if self.sliding:  # reached the pole
+                break
 
         self.check_coin_collision(coins)
 
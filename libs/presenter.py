@@ -0,0 +1,83 @@
+from time import perf_counter
+
+from pygame.display import update as update_display
+from pygame.rect import Rect
+from pygame.surface import Surface
+from pygame.transform import scale, scale2x
+
+
+class Presenter:
+    """
+    Object responsible for showing low-resolution display Surface in the
+    window. Scaling is done directly into the window Surface, and buffer for
+    smooth graphics (scale2x) is allocated only once, so presenting a frame
+    doesn't create any new Surfaces. If only some areas of display have
+    changed, only these areas are scaled and updated.
+    """
+
+    def __init__(self, display: Surface, screen: Surface) -> None:
+        """Initialize Presenter."""
+        self.display = display
+        self.screen = screen
+
+        width, height = display.get_size()
+        self.scale = screen.get_width() // width
+        self.smooth_buffer = Surface((width * 2, height * 2), 0, display)
+
+        # scaling can't write directly into Surface with different format
+        self.same_format = (display.get_bitsize() == screen.get_bitsize() and
+                            display.get_masks() == screen.get_masks())
+        self.scaled_buffer = None
+        if not self.same_format:
+            self.scaled_buffer = Surface(screen.get_size(), 0, display)
+
+        self.present_time = 0.0  # duration of last present() in seconds
+
+    def present_rects(self, dirty_rects: list) -> None:
+        """Scale only changed areas of display into window and update them."""
+        bounds = self.display.get_rect()
+        scaled_rects = []
+        for rect in dirty_rects:
+            rect = rect.clip(bounds)
+            if not rect.width or not rect.height:
+                continue
+            scaled = Rect(rect.x * self.scale, rect.y * self.scale,
+                          rect.width * self.scale, rect.height * self.scale)
+            source = self.display.subsurface(rect)
+            if self.same_format:
+                scale(source, scaled.size, self.screen.subsurface(scaled))
+            else:
+                scale(source, scaled.size, self.scaled_buffer.subsurface(scaled))
+                self.screen.blit(self.scaled_buffer, scaled, scaled)
+            scaled_rects.append(scaled)
+
+        if scaled_rects:
+            update_display(scaled_rects)
+
+    def present(self, smooth_graphics: bool=False,
+                dirty_rects: list | None=None) -> None:
+        """
+        Scale display into window and update it. If dirty_rects are given,
+        only these areas are presented (smooth graphics always need whole
+        display, because scale2x depends on neighbouring pixels).
+        """
+        start = perf_counter()
+
+        if dirty_rects is not None and not smooth_graphics:
+            self.present_rects(dirty_rects)
+            self.present_time = perf_counter() - start
+            return
+
+        source = self.display
+        if smooth_graphics:
+            scale2x(source, self.smooth_buffer)
+            source = self.smooth_buffer
+
+        if self.same_format:
+            scale(source, self.screen.get_size(), self.screen)
+        else:
+            scale(source, self.screen.get_size(), self.scaled_buffer)
+            self.screen.blit(self.scaled_buffer, (0, 0))
+
+        update_display()
+        self.present_time = perf_counter() - start
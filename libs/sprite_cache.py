@@ -0,0 +1,37 @@
+from pygame.surface import Surface
+from pygame.transform import flip
+
+# variants of source images, created on first use and reused later
+_flipped = {}  # (image, flip_x, flip_y) -> Surface
+_faded = {}  # (image, alpha) -> Surface
+_clipped = {}  # (image, width, height) -> Surface
+
+
+def flipped(image: Surface, flip_x: bool, flip_y: bool=False) -> Surface:
+    """Return flipped variant of image."""
+    if not flip_x and not flip_y:
+        return image
+    key = (image, flip_x, flip_y)
+    variant = _flipped.get(key)
+    if variant is None:
+        variant = _flipped[key] = flip(image, flip_x, flip_y)
+    return variant
+
+
+def faded(image: Surface, alpha: int) -> Surface:
+    """Return (half-)transparent variant of image."""
+    key = (image, alpha)
+    variant = _faded.get(key)
+    if variant is None:
+        variant = _faded[key] = image.copy()
+        variant.set_alpha(alpha)
+    return variant
+
+
+def clipped(image: Surface, width: int, height: int) -> Surface:
+    """Return top-left part of image with given size."""
+    key = (image, width, height)
+    variant = _clipped.get(key)
+    if variant is None:
+        variant = _clipped[key] = image.subsurface(0, 0, width, height)
+    return variant
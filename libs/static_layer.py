@@ -0,0 +1,98 @@
+from pygame.sprite import Sprite
+from pygame.surface import Surface
+
+from .camera import Camera
+from .constants import DISPLAY_SIZE
+
+
+class StaticLayer:
+    """
+    Cache of static part of the level (background color, decorations and
+    tiles which don't change) pre-rendered into vertical strips - chunks.
+    Only chunks visible on the screen are blitted every frame. Tiles which
+    are animated or bumped are drawn separately on top of the chunks.
+    """
+
+    def __init__(self, bg_color: tuple, chunk_width: int=256) -> None:
+        """Initialize StaticLayer."""
+        self.bg_color = bg_color
+        self.chunk_width = chunk_width
+        self.height = DISPLAY_SIZE[1]
+
+        self.items = []  # chunk index -> list of sprites baked into chunk
+        self.surfaces = []  # chunk index -> Surface or None if not rendered
+        self.dynamic = {}  # tiles drawn every frame (dict as ordered set)
+
+    def chunks_of(self, sprite: Sprite) -> range:
+        """Return indexes of chunks overlapped by sprite."""
+        first = max(sprite.rect.left // self.chunk_width, 0)
+        last = (sprite.rect.right - 1) // self.chunk_width
+        return range(first, min(last, len(self.items) - 1) + 1)
+
+    def build(self, decorations: list, tiles: list) -> None:
+        """
+        Split sprites between chunks. Decorations are always baked, tiles
+        only when they are static.
+        """
+        sprites = list(decorations) + list(tiles)
+        width = max((sprite.rect.right for sprite in sprites), default=0)
+        count = -(-width // self.chunk_width)
+        self.items = [[] for _ in range(count)]
+        self.surfaces = [None] * count
+        self.dynamic = {}
+
+        for sprite in sprites:
+            for index in self.chunks_of(sprite):
+                self.items[index].append(sprite)
+        for tile in tiles:
+            if not tile.is_static():
+                self.dynamic[tile] = None
+
+    def invalidate(self, tile: Sprite, removed: bool=False) -> None:
+        """
+        Re-render chunks with tile on next draw. Called when tile was
+        bumped, destroyed or its image has changed.
+        """
+        if not removed and not tile.is_static():
+            self.dynamic[tile] = None
+        else:
+            self.dynamic.pop(tile, None)
+
+        for index in self.chunks_of(tile):
+            self.surfaces[index] = None
+
+    def render(self, index: int) -> Surface:
+        """Render chunk with background color and all its static sprites."""
+        surface = Surface((self.chunk_width, self.height)).convert()
+        surface.fill(self.bg_color)
+        offset = index * self.chunk_width
+
+        for sprite in self.items[index]:
+            if sprite in self.dynamic or not sprite.alive():
+                continue
+            surface.blit(sprite.image, (sprite.rect.x - offset, sprite.rect.y))
+
+        self.surfaces[index] = surface
+        return surface
+
+    def draw(self, screen: Surface, camera: Camera) -> None:
+        """Draw visible chunks and dynamic tiles onto screen."""
+        scroll = camera.scroll
+        first = scroll // self.chunk_width
+        last = (scroll + camera.width - 1) // self.chunk_width
+
+        for index in range(first, last + 1):
+            x = index * self.chunk_width - scroll
+            if 0 <= index < len(self.surfaces):
+                surface = self.surfaces[index] or self.render(index)
+                screen.blit(surface, (x, 0))
+            else:  # outside of the map
+                screen.fill(self.bg_color, (x, 0, self.chunk_width, self.height))
+
+        # sprites baked into chunks which weren't blitted are culled too
+        baked = sum(len(items) for items in self.items)
+        drawn = sum(len(items) for items in self.items[max(first, 0):last + 1])
+        camera.drawn += drawn
+        camera.culled += baked - drawn
+
+        camera.draw(self.dynamic, screen)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from string import printable
+
+from pygame.constants import SRCALPHA
+from pygame.font import Font
+from pygame.rect import Rect
+from pygame.surface import Surface
+
+from .constants import TRANSPARENT, WHITE
+
+
+class TextRenderer:
+    """
+    Text renderer for fixed-width pixel font (Press Start 2P). Every glyph is
+    rendered with TrueType only once into glyph atlas (one per color), then
+    texts are composed by blitting cached glyphs. Recently used texts are
+    also cached as whole Surfaces.
+    """
+
+    def __init__(self, font: Font, cache_size: int=128) -> None:
+        """Initialize TextRenderer."""
+        self.font = font
+        self.glyph_width, self.glyph_height = font.size('0')
+        self.characters = printable.strip() + ' '
+
+        self.atlases = {}  # color -> (atlas Surface, char -> glyph Rect)
+        self.cache = OrderedDict()  # (text, color) -> Surface
+        self.cache_size = cache_size
+
+    def atlas(self, color: tuple) -> tuple:
+        """Return glyph atlas for color, render it if it doesn't exist."""
+        atlas = self.atlases.get(color)
+        if atlas is not None:
+            return atlas
+
+        surface = Surface((self.glyph_width * len(self.characters),
+                           self.glyph_height), SRCALPHA)
+        glyphs = {}
+        for i, char in enumerate(self.characters):
+            glyphs[char] = Rect(i * self.glyph_width, 0,
+                                self.glyph_width, self.glyph_height)
+            surface.blit(self.font.render(char, False, color), glyphs[char])
+
+        atlas = self.atlases[color] = (surface, glyphs)
+        return atlas
+
+    def draw(self, screen: Surface, text: str, position: tuple,
+             color: tuple=WHITE) -> Rect:
+        """Draw text onto screen using glyphs. Returns area of the text."""
+        surface, glyphs = self.atlas(color)
+        x, y = position
+        screen.blits([
+            (surface, (x + i * self.glyph_width, y), glyphs[char])
+            for i, char in enumerate(text) if char in glyphs
+        ], False)
+        return Rect(x, y, len(text) * self.glyph_width, self.glyph_height)
+
+    def render(self, text: str, color: tuple=WHITE) -> Surface:
+        """Return Surface with text (cached, least recently used dropped)."""
+        key = (text, color)
+        surface = self.cache.get(key)
+        if surface is not None:
+            self.cache.move_to_end(key)
+            return surface
+
+        surface = Surface((max(len(text), 1) * self.glyph_width,
+                           self.glyph_height), SRCALPHA)
+        surface.fill(TRANSPARENT)
+        self.draw(surface, text, (0, 0), color)
+
+        self.cache[key] = surface
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return surface
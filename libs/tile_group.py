@@ -0,0 +1,196 @@
+from math import gcd
+
+from numpy import array, int32, ndarray, uint8, zeros
+from pygame.rect import Rect
+from pygame.sprite import Group, Sprite
+
+from .constants import TILE_SIZE
+
+
+class TileGroup(Group):
+    """
+    Group of map tiles with uniform grid spatial index. Every tile is stored
+    in all grid cells its rect overlaps, so looking for tiles colliding with
+    a rect only checks a few cells instead of the whole level.
+    Only active tiles (the ones which are animating) are updated.
+    """
+
+    def __init__(self, *sprites: Sprite) -> None:
+        """Initialize TileGroup."""
+        self.cells = {}  # (column, row) -> list of tiles in this cell
+        self.tile_cells = {}  # tile -> cells it's stored in
+        self.order = {}  # tile -> insertion index, keeps Group's ordering
+        self.counter = 0
+        # tiles which have to be updated -> their rects from activation
+        self.active = {}
+        # (bitmap, summed area table, left, top, cell size) of grid cells
+        # covered by tiles
+        self.solid_area = None
+        # functions called with (tile, removed) when tile changes or leaves
+        self.listeners = []
+        super().__init__(*sprites)
+
+    def cells_of(self, rect: Rect) -> list:
+        """Return keys of all grid cells overlapped by rect."""
+        left = rect.left // TILE_SIZE
+        right = (rect.right - 1) // TILE_SIZE
+        top = rect.top // TILE_SIZE
+        bottom = (rect.bottom - 1) // TILE_SIZE
+        return [(x, y) for x in range(left, right + 1)
+                for y in range(top, bottom + 1)]
+
+    def add_internal(self, sprite: Sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        self.order[sprite] = self.counter
+        self.counter += 1
+        self.insert(sprite)
+        self.solid_area = None
+
+    def remove_internal(self, sprite: Sprite) -> None:
+        super().remove_internal(sprite)
+        self.erase(sprite)
+        del self.order[sprite]
+        # removed tile stays in solid_area, it only costs an extra check
+        self.active.pop(sprite, None)
+        for listener in self.listeners:
+            listener(sprite, True)
+
+    def restore(self, order: dict) -> None:
+        """
+        Put back removed tiles from order (tile -> insertion index) saved
+        before, with their original ordering.
+        """
+        removed = [tile for tile in order if tile not in self.order]
+        self.add(*removed)
+        for tile in removed:
+            self.order[tile] = order[tile]
+
+    def insert(self, tile: Sprite) -> None:
+        """Put tile into all cells overlapped by its rect."""
+        keys = self.cells_of(tile.rect)
+        for key in keys:
+            self.cells.setdefault(key, []).append(tile)
+        self.tile_cells[tile] = keys
+
+    def erase(self, tile: Sprite) -> None:
+        """Remove tile from all cells it's stored in."""
+        for key in self.tile_cells.pop(tile):
+            cell = self.cells[key]
+            cell.remove(tile)
+            if not cell:
+                del self.cells[key]
+
+    def reindex(self, tile: Sprite) -> None:
+        """Update cells of the tile after its rect has been moved."""
+        if tile not in self.tile_cells:
+            return
+        self.erase(tile)
+        self.insert(tile)
+        if tile not in self.active:
+            self.solid_area = None
+
+    def activate(self, tile: Sprite) -> None:
+        """Start updating tile every tick."""
+        if tile in self.order and tile not in self.active:
+            self.active[tile] = tuple(tile.rect)
+
+    def deactivate(self, tile: Sprite) -> None:
+        """Stop updating tile."""
+        rect = self.active.pop(tile, None)
+        if rect is not None and rect != tuple(tile.rect):
+            self.solid_area = None  # it didn't come back to its place
+
+    def update(self, *args, **kwargs) -> None:
+        """Update only active tiles."""
+        for tile in tuple(self.active):
+            tile.update(*args, **kwargs)
+
+    def changed(self, tile: Sprite) -> None:
+        """Notify listeners that image or state of the tile has changed."""
+        for listener in self.listeners:
+            listener(tile, False)
+
+    def solidity(self) -> tuple:
+        """
+        Return bitmap (uint8 array) of grid cells covered by tiles, position
+        of its top left corner and size of the cells. Cells are as large as
+        possible (up to TILE_SIZE) while edges of all tiles lie on their
+        borders, so the bitmap is exact. Tiles move only while they're active
+        (and these are checked separately), so it's built again only after
+        adding tiles or when some tile has changed its place.
+        """
+        if self.solid_area is None:
+            rects = [Rect(rect) for rect in self.active.values()]
+            rects.extend(tile.rect for tile in self if tile not in self.active)
+            if not rects:
+                self.set_solidity(zeros((0, 0), uint8), 0, 0, TILE_SIZE)
+                return self.solidity()
+            left = min(rect.left for rect in rects)
+            top = min(rect.top for rect in rects)
+            width = max(rect.right for rect in rects) - left
+            height = max(rect.bottom for rect in rects) - top
+
+            cell = TILE_SIZE
+            for rect in rects:
+                cell = gcd(cell, rect.left - left, rect.right - left,
+                           rect.top - top, rect.bottom - top)
+            bitmap = zeros((-(-height // cell), -(-width // cell)), uint8)
+            for rect in rects:
+                bitmap[(rect.top - top) // cell:(rect.bottom - top) // cell,
+                       (rect.left - left) // cell:
+                       (rect.right - left) // cell] = 1
+            self.set_solidity(bitmap, left, top, cell)
+        bitmap, _, left, top, cell = self.solid_area
+        return bitmap, left, top, cell
+
+    def set_solidity(self, bitmap: ndarray, left: int, top: int,
+                     cell: int) -> None:
+        """
+        Use bitmap of solid cells computed before (e.g. by level compiler).
+        Summed area table of cells is built from it, so any rect is checked
+        in constant time.
+        """
+        height, width = bitmap.shape
+        table = zeros((height + 1, width + 1), int32)
+        table[1:, 1:] = bitmap.cumsum(0, int32).cumsum(1)
+        self.solid_area = (bitmap, table, left, top, cell)
+
+    def occupied(self, positions: ndarray, sizes: ndarray) -> ndarray:
+        """
+        Check for many rects at once (arrays of top left corners and sizes)
+        if they overlap any tile. Only rects for which it's true have to look
+        for colliding tiles.
+        """
+        self.solidity()
+        _, table, left, top, cell = self.solid_area
+        height, width = table.shape[0] - 1, table.shape[1] - 1
+        # cells partially overlapped by rect count too, they're fully solid
+        x0 = positions[:, 0] - left
+        y0 = positions[:, 1] - top
+        x1 = (-(-(x0 + sizes[:, 0]) // cell)).clip(0, width)
+        y1 = (-(-(y0 + sizes[:, 1]) // cell)).clip(0, height)
+        x0 = (x0 // cell).clip(0, width)
+        y0 = (y0 // cell).clip(0, height)
+        area = table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+        result = area > 0
+
+        # active tiles are moving, so they're checked separately
+        if self.active:
+            tiles = array([tuple(tile.rect) for tile in self.active])
+            x, y = positions[:, 0, None], positions[:, 1, None]
+            result |= ((x < tiles[:, 0] + tiles[:, 2]) &
+                       (x + sizes[:, 0, None] > tiles[:, 0]) &
+                       (y < tiles[:, 1] + tiles[:, 3]) &
+                       (y + sizes[:, 1, None] > tiles[:, 1])).any(1)
+        return result
+
+    def colliding(self, rect: Rect) -> list:
+        """Return tiles colliding with rect, in order they were added."""
+        found = []
+        for key in self.cells_of(rect):
+            for tile in self.cells.get(key, ()):
+                if tile not in found and rect.colliderect(tile.rect):
+                    found.append(tile)
+        if len(found) > 1:
+            found.sort(key=self.order.__getitem__)
+        return found
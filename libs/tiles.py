@@ -1,14 +1,24 @@
-from time import time
 from types import FunctionType
 
 from pygame.constants import SRCALPHA
-from pygame.image import load as load_image
-from pygame.mixer import Sound
 from pygame.sprite import Sprite
 from pygame.surface import Surface
 
+from .animation import animations
+from .assets import assets
+from .clock import game_clock
+from .tile_group import TileGroup
+
+
+def sound(path: str) -> property:
+    """Tile's sound effect, it's loaded when it's played for the first time."""
+    return property(lambda self: assets.sound(path))
+
 
 class Tile(Sprite):
+    # attributes changed during the game, restored with level's snapshot
+    state_attributes = ('image', 'bumped')
+
     def __init__(self, image: Surface, position: tuple) -> None:
         super().__init__()
 
@@ -26,34 +36,82 @@ class Tile(Sprite):
     def destroy(self) -> None:
         return
 
+    def is_static(self) -> bool:
+        """Check if tile can be pre-rendered with the rest of the level."""
+        return not self.bumped
+
+    def snapshot(self) -> tuple:
+        """Return copy of tile's mutable state."""
+        return self.rect.topleft, tuple(getattr(self, name)
+                                        for name in self.state_attributes)
+
+    def restore(self, state: tuple) -> None:
+        """Bring tile back to state from snapshot."""
+        position, values = state
+        for name, value in zip(self.state_attributes, values):
+            setattr(self, name, value)
+        if self.rect.topleft != position:
+            self.rect.topleft = position
+            self.reindex()
+
+    def reindex(self) -> None:
+        """Update tile position in spatial indexes of its groups."""
+        for group in self.groups():
+            if isinstance(group, TileGroup):
+                group.reindex(self)
+
+    def activate(self) -> None:
+        """Start updating tile in its groups (while it's animating)."""
+        for group in self.groups():
+            if isinstance(group, TileGroup):
+                group.activate(self)
+
+    def deactivate(self) -> None:
+        """Stop updating tile in its groups."""
+        for group in self.groups():
+            if isinstance(group, TileGroup):
+                group.deactivate(self)
+
+    def redraw(self) -> None:
+        """Notify groups that image or state of the tile has changed."""
+        for group in self.groups():
+            if isinstance(group, TileGroup):
+                group.changed(self)
+
     def draw(self, screen: Surface, scroll: int):
         """Draw sprite onto screen."""
         screen.blit(self.image, (self.rect.x - scroll, self.rect.y))
 
 class Brick(Tile):
+    state_attributes = Tile.state_attributes + ('frame', 'last_time')
+    bump_sound = sound('sfx/smb_bump.wav')
+    break_sound = sound('sfx/smb_breakblock.wav')
+
     def __init__(self, image: Surface, position: tuple,
                  create_debris: FunctionType) -> None:
         super().__init__(image, position)
 
         self.frame = 0
-        self.bump_sound = Sound('sfx/smb_bump.wav')
-        self.break_sound = Sound('sfx/smb_breakblock.wav')
         self.bumped = False
-        self.last_time = time()
+        self.last_time = game_clock.now()
 
         self.create_debris = create_debris
 
     def update(self) -> None:
         if self.bumped:
-            if time() - self.last_time >= 0.015:
+            if game_clock.now() - self.last_time >= 0.015:
                 if self.frame < 5:
                     self.rect.y -= 1
+                    self.reindex()
                 elif self.frame < 10: 
                     self.rect.y += 1
+                    self.reindex()
                 else:
                     self.bumped = False
+                    self.redraw()
+                    self.deactivate()
                 self.frame += 1
-                self.last_time = time()
+                self.last_time = game_clock.now()
 
     def bump(self) -> None:
         if self.bumped:
@@ -62,7 +120,9 @@ class Brick(Tile):
         self.frame = 0
         self.bumped = True
         # just to make sure it gets updated immediately I'm subtracting 1
-        self.last_time = time() - 1
+        self.last_time = game_clock.now() - 1
+        self.activate()
+        self.redraw()
 
     def destroy(self) -> None:
         self.bumped = True
@@ -72,6 +132,8 @@ class Brick(Tile):
 
 
 class CoinBrick(Brick):
+    state_attributes = Brick.state_attributes + ('coins', 'cant_bump')
+
     def __init__(self, image: Surface, position: tuple, plate_image: Surface,
                  create_spinning_coin: FunctionType, add_coin) -> None:
         super().__init__(image, position, None)
@@ -91,38 +153,40 @@ class CoinBrick(Brick):
         self.frame = 0
         self.bumped = True
         # just to make sure it gets updated immediately I'm subtracting 1
-        self.last_time = time() - 1
+        self.last_time = game_clock.now() - 1
+        self.activate()
         self.coins -= 1
         self.create_spinning_coin((self.rect.x + 4, self.rect.y - 16))
         self.add_coin()
         if self.coins == 0:
             self.image = self.plate_image
             self.cant_bump = True
+        self.redraw()
 
     def destroy(self) -> None:
         self.bump()
 
 
-class QuestionBlock(Sprite):
+class QuestionBlock(Tile):
+    state_attributes = Tile.state_attributes + (
+        'frame', 'last_time', 'updated', 'created_coin', 'played_powerup_sound'
+    )
+    bump_sound = sound('sfx/smb_bump.wav')
+    powerup_sound = sound('sfx/smb_powerup_appears.wav')
+
     def __init__(self, position: tuple, create_spinning_coin: FunctionType,
                  add_coin: FunctionType, add_powerup: FunctionType, theme: str,
                  powerup: bool=False) -> None:
-        super().__init__()
-
         self.images = [
-            load_image(f'img/question_block_{i}.png').convert_alpha()
+            assets.image(f'img/question_block_{i}.png')
             for i in range(3)
         ]
-        self.images.append(load_image(f'img/{theme}/plate_0.png').convert_alpha())
+        self.images.append(assets.image(f'img/{theme}/plate_0.png'))
         self.frame = 0
-        self.animation = ((0, 0.45), (1, 0.15), (2, 0.15), (1, 0.15))
-        self.last_time = time()
-
-        self.image = self.images[0]
-        self.rect = self.image.get_rect(topleft=position)
+        self.animation = animations['blink']
+        self.last_time = game_clock.now()
 
-        self.bump_sound = Sound('sfx/smb_bump.wav')
-        self.powerup_sound = Sound('sfx/smb_powerup_appears.wav')
+        super().__init__(self.images[0], position)
 
         self.updated = False
         self.powerup = powerup
@@ -147,25 +211,22 @@ class QuestionBlock(Sprite):
                     self.create_spinning_coin((self.rect.x + 4, self.rect.y - 16))
                     self.add_coin()
                     self.created_coin = True
-            if time() - self.last_time >= 0.015:
+            if game_clock.now() - self.last_time >= 0.015:
                 if self.frame < 5:
                     self.rect.y -= 1
+                    self.reindex()
                 elif self.frame < 10: 
                     self.rect.y += 1
+                    self.reindex()
                 else:
                     self.updated = True
+                    self.redraw()
+                    self.deactivate()
                     if self.powerup:
                         # TODO: powerup appear animation
                         self.add_powerup((self.rect.x, self.rect.y - 16))
                 self.frame += 1
-                self.last_time = time()
-            
-        elif time() - self.last_time >= self.animation[self.frame][1]:
-            self.last_time = time()
-            self.frame += 1
-            if self.frame >= 4:
-                self.frame = 0
-            self.image = self.images[self.animation[self.frame][0]]
+                self.last_time = game_clock.now()
 
     def bump(self) -> None:
         if self.bumped:
@@ -175,18 +236,29 @@ class QuestionBlock(Sprite):
         self.bumped = True
         self.frame = 0
         # just to make sure it gets updated immediately I'm subtracting 1
-        self.last_time = time() - 1
+        self.last_time = game_clock.now() - 1
+        self.activate()
+        self.redraw()
 
     def destroy(self) -> None:
         # it can't be destroyed, but this function must exist
         self.bump()
 
+    def is_static(self) -> bool:
+        # it's animated until it's bumped and turned into plate
+        return self.updated
+
     def draw(self, screen: Surface, scroll: int):
-        """Draw sprite onto screen."""
-        screen.blit(self.image, (self.rect.x - scroll, self.rect.y))
+        """Draw sprite onto screen, blinking with shared animation."""
+        if not self.bumped:
+            self.image = self.images[self.animation.frame]
+        super().draw(screen, scroll)
 
 
 class HiddenBlock(Brick):
+    state_attributes = Brick.state_attributes + ('cant_bump',)
+    powerup_sound = sound('sfx/smb_powerup_appears.wav')
+
     def __init__(self, position: tuple, plate_image: Surface,
                  add_powerup: FunctionType) -> None:
         super().__init__(Surface((16, 16), SRCALPHA), position, None)
@@ -195,7 +267,6 @@ class HiddenBlock(Brick):
 
         self.add_powerup = add_powerup
         self.plate_image = plate_image
-        self.powerup_sound = Sound('sfx/smb_powerup_appears.wav')
 
     def bump(self) -> None:
         if self.bumped or self.cant_bump:
@@ -205,10 +276,12 @@ class HiddenBlock(Brick):
         self.frame = 0
         self.bumped = True
         # just to make sure it gets updated immediately I'm subtracting 1
-        self.last_time = time() - 1
+        self.last_time = game_clock.now() - 1
+        self.activate()
         self.add_powerup((self.rect.x, self.rect.y - 16), oneup=True)
         self.powerup_sound.play()
         self.cant_bump = True
+        self.redraw()
 
 
 class Decoration(Sprite):
@@ -0,0 +1,40 @@
+class VectorBase:
+    """
+    Base of vectors which can be used like Vector2, but keep their values in
+    their own way. Subclasses only implement __getitem__ and __setitem__
+    (values are in pixels), everything else is built on top of them.
+    """
+
+    __slots__ = ()
+
+    @property
+    def x(self) -> float:
+        return self[0]
+
+    @x.setter
+    def x(self, value: float) -> None:
+        self[0] = value
+
+    @property
+    def y(self) -> float:
+        return self[1]
+
+    @y.setter
+    def y(self, value: float) -> None:
+        self[1] = value
+
+    def __getitem__(self, index: int) -> float:
+        raise NotImplementedError
+
+    def __setitem__(self, index: int, value: float) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return 2
+
+    def __imul__(self, value: float) -> 'VectorBase':
+        self.x, self.y = self.x * value, self.y * value
+        return self
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.x}, {self.y})'
@@ -1,17 +1,18 @@
-# TODO: dt=6 after switch from LOADING state to LEVEL state (1 frame)
-# loading level takes too long so with this dt gravity is applied too much
-
+from os import path
 from sys import exit
-from time import time
+from time import perf_counter
 
 import pygame
 from pygame import mixer
-from pygame.constants import (K_ESCAPE, K_F11, K_F12, K_RETURN, KEYDOWN, KEYUP,
-                              QUIT, K_a, K_z)
+from pygame.constants import (K_ESCAPE, K_F8, K_F9, K_F10, K_F11, K_F12,
+                              K_RETURN, KEYDOWN, KEYUP, QUIT, K_a, K_s, K_z)
 
-from libs.constants import (DISPLAY_SIZE, LEVEL_STATE, LOADING_STATE,
-                            MENU_STATE, PHYSICS_FPS, SCREEN_SIZE)
+from libs.assets import assets
+from libs.constants import (ASSETS_ARCHIVE, DISPLAY_SIZE, LEVEL_STATE,
+                            LOADING_STATE, MAX_FRAME_TIME, MENU_STATE,
+                            SCREEN_SIZE, TICK, TICK_DT)
 from libs.controller import Controller
+from libs.presenter import Presenter
 
 
 def main() -> None:
@@ -23,18 +24,25 @@ def main() -> None:
     pygame.display.set_caption("Super Mariusz Bro")
     pygame.display.set_icon(pygame.image.load("img/icon.png").convert_alpha())
 
-    display = pygame.Surface(DISPLAY_SIZE)
+    # packed assets are optional, build them with `python -m libs.archive`
+    if path.exists(ASSETS_ARCHIVE):
+        assets.open_archive(ASSETS_ARCHIVE)
+
+    display = pygame.Surface(DISPLAY_SIZE).convert()
     controller = Controller(display, clock)
-    last_time = time()
+    presenter = Presenter(display, screen)
+    last_time = perf_counter()
+    # time which hasn't been simulated yet
+    accumulator = 0.0
 
     lock_fps = False
     smooth_graphics = False
 
     while True:
-        dt = (time() - last_time) * PHYSICS_FPS
-        last_time = time()
-
-        controller.run(dt)
+        now = perf_counter()
+        # long frames (e.g. loading) are slowed down instead of simulated
+        accumulator += min(now - last_time, MAX_FRAME_TIME)
+        last_time = now
 
         for event in pygame.event.get():
             if event.type == QUIT:
@@ -53,10 +61,21 @@ def main() -> None:
                         controller.pause()
                     elif controller.current_state == MENU_STATE:
                         controller.switch_state(LOADING_STATE)
+                elif event.key == K_s and controller.paused:
+                    controller.step()  # one tick at a time
                 elif event.key == K_F12:
                     lock_fps = not lock_fps
                 elif event.key == K_F11:
                     smooth_graphics = not smooth_graphics
+                    controller.redraw = True
+                elif event.key == K_F10:
+                    controller.dirty_rendering = not controller.dirty_rendering
+                    controller.redraw = True
+                elif event.key == K_F9:
+                    # fixed-point physics is used from the next level load
+                    controller.fixed_point = not controller.fixed_point
+                elif event.key == K_F8:
+                    controller.toggle_slow_motion()
             elif event.type == KEYUP:
                 if event.key == K_z:
                     controller.player.can_jump = False
@@ -64,13 +83,14 @@ def main() -> None:
                 elif event.key == K_a:
                     controller.player.can_shoot = False
 
-        if smooth_graphics:
-            surf = pygame.transform.scale2x(display)
-        else:
-            surf = display.copy()
-        
-        screen.blit(pygame.transform.scale(surf, SCREEN_SIZE), (0, 0))
-        pygame.display.update()
+        # simulation runs with fixed tick, no matter how fast frames are
+        while accumulator >= TICK:
+            controller.update(TICK_DT)
+            accumulator -= TICK
+
+        dirty_rects = controller.draw(accumulator / TICK)
+        presenter.present(smooth_graphics, dirty_rects)
+        controller.present_time = presenter.present_time  # shown by debug
         if lock_fps:
             clock.tick(60)
         else: